@@ -1,36 +1,568 @@
 import tkinter
 import random
-import json
 import os
 import math
-from PIL import Image, ImageTk, ImageSequence
+import time
+import argparse
+import csv
+import io
+import struct
+import sqlite3
+import sys
+import traceback
+import zipfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont, ImageTk
+from asset_cache import AssetLoader, load_frames, load_image, stream_frames
+from replay import (CROSSHAIR, FIRE, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_UP,
+                    ReplayWriter, clamp16, read_replay)
+from leaderboard import Leaderboard
+from wave_table import load_waves
+
+
+def resident_memory():
+    # aktualna rezidentna pamat procesu v bajtoch, None ak sa neda zistit
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+photo_stats = {"created": 0}
+
+
+def make_photo(image):
+    # vsetky PhotoImage idu cez tuto funkciu, aby sa dali pocitat
+    photo_stats["created"] += 1
+    return ImageTk.PhotoImage(image)
+
+
+class PerfStats:
+    # klzave okno casov poslednych snimkov, zapis za frame je jedno priradenie do pola
+    phases = ("tick_game", "draw_all", "draw_hud", "tk_idle", "frame")
+
+    def __init__(self, window=240):
+        self.window = window
+        self.samples = np.zeros((len(self.phases), window))
+        self.index = 0
+        self.count = 0
+
+    def record(self, times):
+        self.samples[:, self.index] = times
+        self.index = (self.index + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    def summary(self):
+        # casy v milisekundach, pocita sa len ked sa zobrazuju alebo zapisuju
+        stats = {}
+        if not self.count:
+            return stats
+        data = self.samples[:, :self.count] * 1000
+        for row, name in enumerate(self.phases[:-1]):
+            stats[name + "_avg"] = float(data[row].mean())
+            stats[name + "_p95"] = float(np.percentile(data[row], 95))
+        p50, p95, p99 = np.percentile(data[-1], (50, 95, 99))
+        stats["frame_p50"] = float(p50)
+        stats["frame_p95"] = float(p95)
+        stats["frame_p99"] = float(p99)
+        return stats
+
+
+class QualityGovernor:
+    # uroven kvality podla casu prace na snimku (bez cakania na dalsi frame).
+    # Klzavy priemer nad high * budget zhorsi kvalitu o uroven, pod low * budget ju
+    # vrati spat; obe musia platit hold / settle snimkov za sebou, aby uroven neskakala
+    levels = ("plna", "bez plamenov", "hrubsie uhly", "obycajny text", "menej snimkov menu")
+
+    def __init__(self, budget_ms=25.0, pinned=None, high=0.9, low=0.5, hold=30, settle=240):
+        self.budget = budget_ms / 1000
+        self.pinned = pinned
+        self.level = pinned if pinned is not None else 0
+        self.high = high
+        self.low = low
+        self.hold = hold
+        self.settle = settle
+        self.average = None
+        self.over = 0
+        self.under = 0
+
+    def name(self):
+        return self.levels[self.level]
+
+    def record(self, work_time):
+        # vrati True, ked sa uroven zmenila
+        if self.pinned is not None:
+            return False
+        if self.average is None:
+            self.average = work_time
+        else:
+            self.average += (work_time - self.average) * 0.1
+
+        if self.average > self.budget * self.high:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.budget * self.low:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = 0
+            self.under = 0
+
+        if self.over >= self.hold and self.level < len(self.levels) - 1:
+            self.level += 1
+            self.over = 0
+            return True
+        if self.under >= self.settle and self.level > 0:
+            self.level -= 1
+            self.under = 0
+            return True
+        return False
+
+
+def layer_item(canvas, item, layer):
+    canvas.tag_lower(item, "layer:" + layer)
+    return item
+
+
+class AlphaMask:
+    # nepriehladne pixely obrazka zbalene po bitoch, riadok je jedno cele cislo (bit x = stlpec x);
+    # suradnice su relativne k stredu obrazka ako pri create_image a hitboxe
+    def __init__(self, img, threshold=127):
+        opaque = np.asarray(img.getchannel("A")) > threshold
+        self.width = img.width
+        self.height = img.height
+        self.ox = img.width // 2
+        self.oy = img.height // 2
+        self.bits = np.packbits(opaque, axis=1, bitorder="little")
+        self.rows = [int.from_bytes(row.tobytes(), "little") for row in self.bits]
+
+    def hits_box(self, x1, y1, x2, y2):
+        # dotyka sa obdlznik aspon jedneho nepriehladneho pixela
+        c1 = max(math.floor(x1) + self.ox, 0)
+        c2 = min(math.ceil(x2) + self.ox, self.width)
+        r1 = max(math.floor(y1) + self.oy, 0)
+        r2 = min(math.ceil(y2) + self.oy, self.height)
+        if c1 >= c2 or r1 >= r2:
+            return False
+        span = ((1 << (c2 - c1)) - 1) << c1
+        rows = self.rows
+        for r in range(r1, r2):
+            if rows[r] & span:
+                return True
+        return False
+
+    def overlaps(self, other, dx, dy):
+        # prekryv s maskou other, ktorej stred je posunuty o (dx, dy), na cele pixely
+        shift = round(dx) - other.ox + self.ox
+        top = round(dy) - other.oy + self.oy
+        rows = self.rows
+        other_rows = other.rows
+        for r in range(max(top, 0), min(top + other.height, self.height)):
+            row = other_rows[r - top]
+            row = row << shift if shift >= 0 else row >> -shift
+            if rows[r] & row:
+                return True
+        return False
+
+    def sweep_box(self, sx, sy, dx, dy, r, t_in, t_out):
+        # stvorec s polomerom r ide z (sx, sy) o t * (dx, dy); t_in, t_out je usek, kde je
+        # v obdlzniku obrazka. Polohy idu po najviac r, takze sa susedne stvorce prekryvaju
+        steps = int(math.hypot(dx, dy) * (t_out - t_in) / r) + 1
+        for k in range(steps + 1):
+            t = t_in + (t_out - t_in) * k / steps
+            x = sx + dx * t
+            y = sy + dy * t
+            if self.hits_box(x - r, y - r, x + r, y + r):
+                return t
+        return None
+
+
+class RotationCache:
+    # otocene snimky pre kvantovane uhly, kluc je (snimok, bucket)
+    def __init__(self, frames, buckets=72, offset=0, max_bytes=None):
+        self.frames = frames
+        self.buckets = buckets
+        self.step = 360 / buckets
+        self.offset = offset
+        self.max_bytes = max_bytes
+        # pri nizsej kvalite sa kresli len kazdy coarse-ty bucket, hitbox ostava presny
+        self.coarse = 1
+        self.entries = OrderedDict()
+        self.hitboxes = {}
+        self.masks = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bucket(self, angle):
+        return int(round(angle / self.step)) % self.buckets
+
+    def draw_bucket(self, bucket):
+        c = self.coarse
+        return (bucket + c // 2) // c * c % self.buckets
+
+    def get_entry(self, frame, bucket):
+        key = (frame, bucket)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            img = self.frames[frame].rotate(-bucket * self.step + self.offset, expand=True)
+            entry = [img, None]
+            self.entries[key] = entry
+            self.bytes += img.width * img.height * 4
+            self.trim()
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def hitbox(self, bucket, frame=0):
+        # obdlznik nepriehladnych pixelov, relativne k stredu obrazka
+        box = self.hitboxes.get((frame, bucket))
+        if box is None:
+            img = self.get_entry(frame, bucket)[0]
+            w, h = img.size
+            x1, y1, x2, y2 = img.getbbox() or (0, 0, w, h)
+            box = (x1 - w // 2, y1 - h // 2, x2 - w // 2, y2 - h // 2)
+            self.hitboxes[(frame, bucket)] = box
+        return box
+
+    def mask(self, bucket, frame=0):
+        mask = self.masks.get((frame, bucket))
+        if mask is None:
+            mask = AlphaMask(self.get_entry(frame, bucket)[0])
+            self.masks[(frame, bucket)] = mask
+        return mask
+
+    def photo(self, bucket, frame=0):
+        entry = self.get_entry(frame, bucket)
+        if entry[1] is None:
+            entry[1] = make_photo(entry[0])
+            self.bytes += entry[0].width * entry[0].height * 4
+            self.trim()
+        return entry[1]
+
+    def trim(self):
+        # najdlhsie nepouzite snimky idu von, posledny pouzity vzdy ostava
+        if self.max_bytes is None:
+            return
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (img, tk_img) = self.entries.popitem(last=False)
+            size = img.width * img.height * 4
+            self.bytes -= size * 2 if tk_img is not None else size
+            self.evictions += 1
+
+    def prerotate(self):
+        # len PIL cast bez PhotoImage, da sa spustit aj mimo hlavneho vlakna
+        for frame in range(len(self.frames)):
+            for bucket in range(self.buckets):
+                self.hitbox(bucket, frame)
+                self.mask(bucket, frame)
+
+    def prebuild(self):
+        for frame in range(len(self.frames)):
+            for bucket in range(self.buckets):
+                self.hitbox(bucket, frame)
+                self.mask(bucket, frame)
+                self.photo(bucket, frame)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# pamat pre snimky pozadia menu, vo velkom rozliseni sa kvoli nej preskakuju snimky
+MENU_BG_BYTES = 128 * 1024 * 1024
+
+
+class MenuFrameSource:
+    # snimky pozadia menu sa citaju z cache na disku az ked treba a par dalsich sa chysta
+    # dopredu; PhotoImage ostavaju, kym je menu otvorene, a pri odchode sa pustia vsetky.
+    # Animacia ide dookola, takze LRU mensie ako slucka by minulo na kazdom snimku;
+    # ked sa cela slucka do max_bytes nezmesti, radsej sa snimky preskakuju
+    def __init__(self, path, size, max_bytes, read_ahead=3):
+        self.path = path
+        self.size = size
+        self.frame_bytes = size[0] * size[1] * 4
+        self.max_frames = max(1, max_bytes // self.frame_bytes)
+        self.read_ahead = min(read_ahead, self.max_frames - 1)
+        # pri nizsej kvalite sa kazdy druhy snimok preskoci
+        self.quality_step = 1
+        self.frames = None
+        self.loaded = False
+        self.count = 0
+        self.photos = OrderedDict()
+        self.ready = {}
+        self.pending = set()
+        self.generation = 0
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def step(self):
+        # o kolko snimkov sa animacia posuva, aby sa navstivene snimky zmestili do max_frames
+        fit = -(-self.count // self.max_frames)
+        return max(self.quality_step, fit)
+
+    def next_index(self, index, steps=1):
+        # slucka zacina vzdy od nuly, takze sa navstivi len 0, step, 2*step...
+        step = self.step
+        for _ in range(steps):
+            index += step
+            if index >= self.count:
+                index = 0
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def put(self, index, frame):
+        # snimok este pocas prveho dekodovania, kym nie je hotova cache
+        self.count = max(self.count, index + 1)
+        if index < self.max_frames:
+            self.store(index, make_photo(frame))
+
+    def attach(self, frames):
+        self.frames = frames
+        self.count = len(frames)
+        self.loaded = True
+
+    def store(self, index, photo):
+        self.photos[index] = photo
+        self.photos.move_to_end(index)
+        while len(self.photos) > self.max_frames:
+            self.photos.popitem(last=False)
+
+    def get(self, index):
+        photo = self.photos.get(index)
+        if photo is None:
+            if self.frames is None and self.loaded:
+                self.attach(stream_frames(self.path, self.size))
+            if self.frames is None or index >= len(self.frames):
+                return None
+            frame = self.ready.pop(index, None)
+            if frame is None:
+                if self.photos:
+                    # snimok sa este cita vo vlakne, zatial ostane predchadzajuci
+                    self.prefetch(index, first=0)
+                    return None
+                frame = self.frames[index]
+            photo = make_photo(frame)
+            self.store(index, photo)
+        else:
+            self.photos.move_to_end(index)
+        self.prefetch(index)
+        return photo
+
+    def prefetch(self, index, first=1):
+        # dalsie snimky sa nacitaju z disku vo vlakne, v hlavnom sa z nich uz len robi PhotoImage
+        if self.frames is None or not self.count:
+            return
+        wanted = set()
+        for i in range(first, self.read_ahead + 1):
+            j = self.next_index(index, i)
+            if j in self.photos:
+                continue
+            wanted.add(j)
+            if j not in self.ready and j not in self.pending:
+                self.pending.add(j)
+                self.executor.submit(self.load_ahead, j, self.frames, self.generation)
+        for j in list(self.ready):
+            if j not in wanted:
+                del self.ready[j]
+
+    def load_ahead(self, index, frames, generation):
+        try:
+            frame = frames[index]
+        except (OSError, ValueError):
+            # subor sa medzitym zavrel pri odchode z menu
+            self.pending.discard(index)
+            return
+        if generation == self.generation:
+            self.ready[index] = frame
+        self.pending.discard(index)
+
+    def release(self):
+        # pri odchode z menu sa pusti vsetko, aj otvoreny subor
+        self.generation += 1
+        self.photos.clear()
+        self.ready.clear()
+        self.pending.clear()
+        if self.loaded and self.frames is not None:
+            if hasattr(self.frames, "close"):
+                self.frames.close()
+            self.frames = None
+
+    def close(self):
+        self.release()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+FONT_ZIP = "Press_Start_2P.zip"
+FONT_FILE = "PressStart2P-Regular.ttf"
+
+
+def load_font_data(path=FONT_ZIP, name=FONT_FILE):
+    with zipfile.ZipFile(path) as zf:
+        return zf.read(name)
+
+
+class TextAtlas:
+    # pismo sa vykresli cez PIL, glyfy maju obrys uz v sebe a cely retazec
+    # je jeden obrazok, takze text s obrysom je jedna polozka canvasu namiesto 25
+    def __init__(self, font_data, px_per_point=96 / 72, max_strings=256):
+        self.font_data = font_data
+        self.px_per_point = px_per_point
+        self.max_strings = max_strings
+        self.fonts = {}
+        self.glyphs = {}
+        self.strings = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            px = max(1, round(size * self.px_per_point))
+            font = ImageFont.truetype(io.BytesIO(self.font_data), px)
+            self.fonts[size] = font
+        return font
+
+    def glyph(self, ch, size, width):
+        # masky vyplne a obrysu, farby sa doplnia az pri skladani retazca
+        key = (ch, size, width)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            font = self.font(size)
+            ascent, descent = font.getmetrics()
+            advance = max(1, round(font.getlength(ch)))
+            mask = Image.new("L", (advance + 2 * width, ascent + descent + 2 * width))
+            ImageDraw.Draw(mask).text((width, width), ch, font=font, fill=255)
+            if width:
+                # stvorcove rozsirenie o width je to iste ako kopie posunute o -width..width
+                outline = mask.filter(ImageFilter.MaxFilter(2 * width + 1))
+            else:
+                outline = mask
+            glyph = (advance, np.asarray(mask), np.asarray(outline))
+            self.glyphs[key] = glyph
+        return glyph
+
+    def render(self, text, size, fill, outline, width):
+        font = self.font(size)
+        ascent, descent = font.getmetrics()
+        glyphs = [self.glyph(ch, size, width) for ch in text]
+        w = sum(g[0] for g in glyphs) + 2 * width
+        h = ascent + descent + 2 * width
+        fill_mask = np.zeros((h, w), dtype=np.uint8)
+        outline_mask = np.zeros((h, w), dtype=np.uint8)
+        x = 0
+        for advance, g_fill, g_outline in glyphs:
+            gw = g_fill.shape[1]
+            np.maximum(fill_mask[:, x:x + gw], g_fill, out=fill_mask[:, x:x + gw])
+            np.maximum(outline_mask[:, x:x + gw], g_outline, out=outline_mask[:, x:x + gw])
+            x += advance
+
+        # vypln sa kresli cez obrys, rovnako ako predtym posledna polozka textu
+        a = fill_mask[:, :, None] / 255.0
+        rgb = (np.array(ImageColor.getrgb(fill)[:3]) * a +
+               np.array(ImageColor.getrgb(outline)[:3]) * (1 - a))
+        rgba = np.dstack((rgb.astype(np.uint8), np.maximum(fill_mask, outline_mask)))
+        return Image.fromarray(rgba, "RGBA")
+
+    def photo(self, text, size, fill="white", outline="black", width=2):
+        key = (text, size, fill, outline, width)
+        photo = self.strings.get(key)
+        if photo is None:
+            self.misses += 1
+            photo = make_photo(self.render(text, size, fill, outline, width))
+            self.strings[key] = photo
+            if len(self.strings) > self.max_strings:
+                self.strings.popitem(last=False)
+        else:
+            self.hits += 1
+            self.strings.move_to_end(key)
+        return photo
 
 
 class Player:
-    def __init__(self, canvas, x, y, base_img=None):
-        self.canvas = canvas
+    layer = "player"
+
+    def __init__(self, x, y, base_img=None, rotation_buckets=72):
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
+        self.draw_x = x
+        self.draw_y = y
         self.vx = 0
         self.vy = 0
         self.speed = 6
 
         self.sprite = None
         self.visible = True
+        self.shown = False
 
         self.angle = 0
+        self.angle_bucket = None
+        self.drawn_bucket = None
         self.base_img = base_img
         self.current_image = None
-
+        self.rotations = None
+
+        self.width = 40
+        self.height = 40
+        self.hitbox = (-20, -20, 20, 20)
+        # bez obrazka alebo s vypnutymi maskami sa zasahy beru podla hitboxu
+        self.use_mask = True
+        self.mask = None
         if self.base_img is not None:
-            self.width, self.height = self.base_img.size
-        else:
-            self.width = 40
-            self.height = 40
-
-    def update(self, world_width, world_height):
-        self.x += self.vx
-        self.y += self.vy
+            self.set_rotations(RotationCache([base_img], buckets=rotation_buckets, offset=-90))
+
+    def set_rotations(self, rotations):
+        self.base_img = rotations.frames[0]
+        self.rotations = rotations
+        self.angle_bucket = None
+        self.set_angle(self.angle)
+
+    def set_use_mask(self, use_mask):
+        self.use_mask = use_mask
+        self.angle_bucket = None
+        self.set_angle(self.angle)
+
+    def set_angle(self, angle):
+        self.angle = angle
+        if self.rotations is None:
+            return
+        bucket = self.rotations.bucket(angle)
+        if bucket != self.angle_bucket:
+            self.angle_bucket = bucket
+            self.hitbox = self.rotations.hitbox(bucket)
+            self.mask = self.rotations.mask(bucket) if self.use_mask else None
+            self.width = self.hitbox[2] - self.hitbox[0]
+            self.height = self.hitbox[3] - self.hitbox[1]
+
+    def update(self, world_width, world_height, dt=1.0):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.vx * dt
+        self.y += self.vy * dt
 
         if self.x < self.width // 2:
             self.x = self.width // 2
@@ -45,326 +577,998 @@ class Player:
             self.y = world_height - self.height // 2
 
     def get_bbox(self):
-        return (self.x - self.width // 2,
-                self.y - self.height // 2,
-                self.x + self.width // 2,
-                self.y + self.height // 2)
+        x1, y1, x2, y2 = self.hitbox
+        return (self.x + x1,
+                self.y + y1,
+                self.x + x2,
+                self.y + y2)
+
+    def teleport(self, x, y):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+
+    def draw(self, canvas, alpha=1.0):
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        self.draw_x = x
+        self.draw_y = y
+
+        if self.sprite is None:
+            if self.base_img is not None:
+                self.sprite = canvas.create_image(x, y)
+            else:
+                self.sprite = canvas.create_rectangle(0, 0, 0, 0, fill="cyan")
+            layer_item(canvas, self.sprite, self.layer)
+            self.shown = True
 
-    def draw(self):
         if not self.visible:
-            if self.sprite is not None:
-                self.canvas.delete(self.sprite)
-                self.sprite = None
+            if self.shown:
+                canvas.itemconfig(self.sprite, state="hidden")
+                self.shown = False
             return
 
-        if self.sprite is not None:
-            self.canvas.delete(self.sprite)
+        if not self.shown:
+            canvas.itemconfig(self.sprite, state="normal")
+            self.shown = True
 
         if self.base_img is not None:
-            rotated = self.base_img.rotate(-self.angle - 90, expand=True)
-            self.current_image = ImageTk.PhotoImage(rotated)
-            self.sprite = self.canvas.create_image(
-                self.x,
-                self.y,
-                image=self.current_image
-            )
-            self.width, self.height = rotated.size
+            bucket = self.rotations.draw_bucket(self.angle_bucket)
+            if bucket != self.drawn_bucket:
+                self.current_image = self.rotations.photo(bucket)
+                canvas.itemconfig(self.sprite, image=self.current_image)
+                self.drawn_bucket = bucket
+            canvas.coords(self.sprite, x, y)
 
         else:
-            self.sprite = self.canvas.create_rectangle(
-                self.x - self.width // 2,
-                self.y - self.height // 2,
-                self.x + self.width // 2,
-                self.y + self.height // 2,
-                fill="cyan"
+            canvas.coords(
+                self.sprite,
+                x - self.width // 2,
+                y - self.height // 2,
+                x + self.width // 2,
+                y + self.height // 2
             )
 
-class Enemy:
-    def __init__(self, canvas, x, y, vy,
-                 can_shoot=False,
-                 image_normal=None,
-                 image_hit=None,
-                 vx=0,
-                 effect_frames=None,
-                 kind = "basic",
-                 projectile_color="lightblue",
-                 projectile_speed_mult=1.0):
-        self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.vy = vy
-        self.vx = vx
-        self.kind = kind
+    def undraw(self, canvas):
+        if self.sprite is not None:
+            canvas.delete(self.sprite)
+            self.sprite = None
+            self.drawn_bucket = None
+
+
+def sweep(x0, y0, dx, dy, x1, y1, x2, y2):
+    # usecka (x0, y0) + t * (dx, dy) pre t z <0, 1> proti obdlzniku x1..x2 x y1..y2 (aj okraj),
+    # metoda slabov; vrati (t_in, t_out), kedy je usecka v obdlzniku, alebo None. Vola sa len
+    # pre par dvojic, ktore presli hrubym testom, v Pythone je to lacnejsie nez cesta cez NumPy
+    t_in = 0.0
+    t_out = 1.0
+    for p, d, lo, hi in ((x0, dx, x1, x2), (y0, dy, y1, y2)):
+        if d == 0:
+            if p < lo or p > hi:
+                return None
+            continue
+        a = (lo - p) / d
+        b = (hi - p) / d
+        if a > b:
+            a, b = b, a
+        if a > t_in:
+            t_in = a
+        if b < t_out:
+            t_out = b
+        if t_in > t_out:
+            return None
+    return t_in, t_out
+
+
+
+# od tolkych dvojic strela x nepriatel sa hruby test nerobi celou maticou
+SWEEP_PAIRS = 4096
+
+
+def sweep_pairs(paths, x1, x2):
+    # sort and sweep po osi x: dvojice (strela, obdlznik), ktorych x sa prekryvaju, bez
+    # matice vsetkych dvojic. Obdlzniky sa zoradia podla laveho okraja a kazda strela si
+    # binarnym hladanim najde usek, ktory jej moze zasahovat do x
+    order = np.argsort(x1, kind="stable")
+    left = x1[order]
+    lo = np.searchsorted(left, paths[:, 4] - (x2 - x1).max())
+    hi = np.searchsorted(left, paths[:, 6], side="right")
+    counts = hi - lo
+    total = int(counts.sum())
+    rows = np.repeat(np.arange(len(paths)), counts)
+    cols = order[np.arange(total) - np.repeat(np.cumsum(counts) - counts - lo, counts)]
+    keep = paths[rows, 4] <= x2[cols]
+    return rows[keep], cols[keep]
+
+def move_zigzag(enemies, idx, player, level, dt):
+    # vlni sa okolo stlpca, v ktorom sa objavil, aj pocas umierania
+    phase = enemies.phase[idx] + enemies.zigzag_speed[idx] * dt
+    enemies.phase[idx] = phase
+    enemies.x[idx] = enemies.base_x[idx] + np.sin(phase) * enemies.ampl[idx]
+
+
+def move_chaser(enemies, idx, player, level, dt):
+    # zivy prenasledovatel ide priamo za hracom, od polohy pred tymto tickom
+    idx = idx[~enemies.dying[idx]]
+    if player is None or not len(idx):
+        return
+    cx = enemies.prev_x[idx]
+    cy = enemies.prev_y[idx]
+    dx = player.x - cx
+    dy = player.y - cy
+    length = np.hypot(dx, dy)
+    length[length == 0] = 1.0
+    speed = (4.0 + level * 0.3) * dt
+    cx += dx / length * speed
+    cy += dy / length * speed
+    enemies.x[idx] = cx
+    enemies.y[idx] = cy
+
+
+class EnemyKind:
+    # druh nepriatela: pohyb nad indexmi v EnemyManager (None = len rovno podla vx, vy),
+    # kluce obrazkov vo World.images a jeho strely
+    def __init__(self, name, move=None, image="enemy_normal", hit_image="enemy_hit",
+                 projectile_color="lightblue", projectile_speed=1.0, shoots=True):
+        self.name = name
+        self.move = move
+        self.image = image
+        self.hit_image = hit_image
         self.projectile_color = projectile_color
-        self.projectile_speed_mult = projectile_speed_mult
-        if image_normal is not None:
-            self.width = image_normal.width()
-            self.height = image_normal.height()
-        else:
-            self.width = 30
-            self.height = 30
-
-        self.can_shoot = can_shoot
-        self.shoot_cooldown = random.randint(5, 20) if can_shoot else -1
-
-        self.image_normal = image_normal
-        self.image_hit = image_hit
-        self.sprite = None
-
-        self.is_dying = False
-        self.death_timer = 0
-
-        self.zigzag_phase = random.uniform(0, 2 * math.pi)
-        self.zigzag_ampl = random.randint(40, 120)
-        self.zigzag_speed = random.uniform(0.03, 0.07)
-        self.base_x = x
-
-        self.effect_frames = effect_frames or []
-        self.effect_index = 0
+        self.projectile_speed = projectile_speed
+        self.shoots = shoots
+        self.id = None
+
+
+ENEMY_TYPES = {}
+
+
+def register_kind(kind):
+    kind.id = len(ENEMY_TYPES)
+    ENEMY_TYPES[kind.name] = kind
+    return kind
+
+
+register_kind(EnemyKind("basic"))
+register_kind(EnemyKind("zigzag", move_zigzag, projectile_color="#ff66ff", projectile_speed=0.6))
+register_kind(EnemyKind("chaser", move_chaser, image="enemy_chaser", projectile_color="#ff4444",
+                        shoots=False))
+# poradie druhov plati aj pre vahy v DIFFICULTY
+ENEMY_KINDS = tuple(ENEMY_TYPES)
+
+
+class EnemyManager:
+    # nepriatelia ako struct-of-arrays, pohyb a strelba sa pocitaju naraz pre kazdy druh;
+    # kind je index do ENEMY_KINDS, obrazky a farby striel su indexy do zoznamov nizsie
+    layer = "enemies"
+    fields = (
+        ("x", np.float64), ("y", np.float64), ("prev_x", np.float64), ("prev_y", np.float64),
+        ("vx", np.float64), ("vy", np.float64), ("base_x", np.float64),
+        ("phase", np.float64), ("ampl", np.float64), ("zigzag_speed", np.float64),
+        ("cooldown", np.float64), ("death_timer", np.float64), ("speed_mult", np.float64),
+        ("effect_counter", np.float64), ("effect_index", np.int32),
+        ("width", np.int32), ("height", np.int32), ("kind", np.int8),
+        ("color", np.int16), ("image", np.int16),
+        ("can_shoot", np.bool_), ("dying", np.bool_),
+    )
+
+    def __init__(self, capacity=64, rng=random):
+        self.rng = rng
+        self.count = 0
+        for name, dtype in self.fields:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.colors = []
+        self.color_ids = {}
+        self.images = []
+        self.image_ids = {}
+        self.effect_frames = []
         self.effect_speed = 3
-        self.effect_counter = 0
-
-    def start_dying(self):
-        self.is_dying = True
-        self.death_timer = 10
-        self.can_shoot = False
-        self.vx *= 0.5
-        self.vy *= 0.5
-
-    def update(self, spawn_projectile_callback, player=None, level=1):
-        canvas_height = self.canvas.winfo_height()
-        line_y = canvas_height // 4
-
-        if self.kind == "chaser" and player is not None and not self.is_dying:
-            dx = player.x - self.x
-            dy = player.y - self.y
-            length = math.hypot(dx, dy) or 1.0
-
-            speed = 4.0 + level * 0.3
-            self.x += dx / length * speed
-            self.y += dy / length * speed
-
+        self.show_effects = True
+        self.moving_kinds = [spec for spec in ENEMY_TYPES.values() if spec.move is not None]
+        self.kind_shoots = np.array([spec.shoots for spec in ENEMY_TYPES.values()])
+
+        # polozky canvasu patria slotom, slot i vzdy kresli i-teho nepriatela
+        self.sprites = []
+        self.effect_sprites = []
+        self.drawn_image = []
+        self.drawn_effect = []
+        self.effect_shown = []
+        self.shown = 0
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        return [getattr(self, name) for name, _ in self.fields]
+
+    def grow(self):
+        capacity = len(self.x) * 2
+        for name, dtype in self.fields:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def lookup(self, table, ids, value):
+        index = ids.get(value)
+        if index is None:
+            index = len(table)
+            table.append(value)
+            ids[value] = index
+        return index
+
+    def spawn(self, x, y, vy,
+              can_shoot=False,
+              image_normal=None,
+              image_hit=None,
+              vx=0,
+              effect_frames=None,
+              kind="basic",
+              projectile_color="lightblue",
+              projectile_speed_mult=1.0,
+              size=None):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        rng = self.rng
+
+        self.x[i] = self.prev_x[i] = self.base_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.kind[i] = ENEMY_TYPES[kind].id
+        self.color[i] = self.lookup(self.colors, self.color_ids, projectile_color)
+        self.image[i] = self.lookup(self.images, self.image_ids, (image_normal, image_hit))
+        self.speed_mult[i] = projectile_speed_mult
+        if size is not None:
+            self.width[i], self.height[i] = size
+        elif image_normal is not None:
+            self.width[i] = image_normal.width()
+            self.height[i] = image_normal.height()
         else:
-            self.y += self.vy
-
-            if self.kind == "zigzag":
-                self.zigzag_phase += self.zigzag_speed
-                self.x = self.base_x + math.sin(self.zigzag_phase) * self.zigzag_ampl
-
-            else:
-                self.x += self.vx
-
-        if self.can_shoot and self.kind != "chaser" and self.y > line_y and not self.is_dying:
-            self.shoot_cooldown -= 1
-            if self.shoot_cooldown <= 0:
-                self.shoot_cooldown = random.randint(30, 50)
-
-                base_speed = 6 + level * 0.3
-                speed = base_speed * self.projectile_speed_mult
-
-                if player is not None:
-                    t = 15
-                    target_x = player.x + player.vx * t
-                    target_y = player.y + player.vy * t
-
-                    dx = target_x - self.x
-                    dy = target_y - (self.y + self.height // 2)
-                    length = math.hypot(dx, dy) or 1.0
-
-                    vx = dx / length * speed
-                    vy = dy / length * speed
-
-                    vx += random.uniform(-1.0, 1.0)
-                    vy += random.uniform(-0.5, 0.5)
-                else:
-                    vx = random.uniform(-1.5, 1.5)
-                    vy = speed
-
-                spawn_projectile_callback(
-                    self.x,
-                    self.y + self.height // 2,
-                    vx,
-                    vy,
-                    color=self.projectile_color
-                )
+            self.width[i] = 30
+            self.height[i] = 30
+
+        # poradie volani rng sa nesmie menit, inak by sa rozisli ulozene zaznamy hier
+        self.can_shoot[i] = can_shoot
+        self.cooldown[i] = rng.randint(5, 20) if can_shoot else -1
+        self.dying[i] = False
+        self.death_timer[i] = 0
+        self.phase[i] = rng.uniform(0, 2 * math.pi)
+        self.ampl[i] = rng.randint(40, 120)
+        self.zigzag_speed[i] = rng.uniform(0.03, 0.07)
+
+        if effect_frames:
+            self.effect_frames = effect_frames
+        self.effect_index[i] = 0
+        self.effect_counter[i] = 0
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def compact(self, keep):
+        if keep.all():
+            return
+        idx = np.flatnonzero(keep)
+        m = len(idx)
+        for arr in self.arrays():
+            arr[:m] = arr[idx]
+        self.count = m
+
+    def remove(self, indices):
+        keep = np.ones(self.count, dtype=bool)
+        keep[indices] = False
+        self.compact(keep)
+
+    def start_dying(self, i):
+        self.dying[i] = True
+        self.death_timer[i] = 10
+        self.can_shoot[i] = False
+        self.vx[i] *= 0.5
+        self.vy[i] *= 0.5
+
+    def update(self, spawn_projectile_callback, world_width, world_height, player=None,
+               level=1, dt=1.0):
+        # vsetci sa posunu rovno, potom kazdy druh s vlastnym pohybom prepise svoje indexy;
+        # nonzero je pri par nepriateloch lacnejsie nez any() a np.where
+        n = self.count
+        if n == 0:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        kind = self.kind[:n]
+        dying = self.dying[:n]
+        line_y = world_height // 4
+
+        x += self.vx[:n] * dt
+        y += self.vy[:n] * dt
+
+        for spec in self.moving_kinds:
+            idx = (kind == spec.id).nonzero()[0]
+            if len(idx):
+                spec.move(self, idx, player, level, dt)
+
+        shoots = self.kind_shoots[kind]
+        shooters = (self.can_shoot[:n] & shoots & (y > line_y) & ~dying).nonzero()[0]
+        if len(shooters):
+            cooldown = self.cooldown[shooters] - dt
+            self.cooldown[shooters] = cooldown
+            fire = shooters[cooldown <= 0]
+            if len(fire):
+                self.fire(fire, spawn_projectile_callback, player, level)
 
         if self.effect_frames:
-            self.effect_counter += 1
-            if self.effect_counter >= self.effect_speed:
-                self.effect_counter = 0
-                self.effect_index = (self.effect_index + 1) % len(self.effect_frames)
-
-    def draw(self):
-        if self.sprite is not None:
-            self.canvas.delete(self.sprite)
-
-        if getattr(self, "effect_frames", None):
-            eff = self.effect_frames[self.effect_index % len(self.effect_frames)]
-            self.canvas.create_image(self.x, self.y, image=eff)
-
-        if self.is_dying:
-            r = int(min(self.width, self.height) * 0.6)
-
-            if self.death_timer % 2 == 0:
-                farba = "#ffcc33"
+            counter = self.effect_counter[:n]
+            counter += dt
+            step = (counter >= self.effect_speed).nonzero()[0]
+            if len(step):
+                counter[step] -= self.effect_speed
+                self.effect_index[step] = (self.effect_index[step] + 1) % len(self.effect_frames)
+
+        gone = (y > world_height + 40) | (x < -40) | (x > world_width + 40)
+        dead = dying.nonzero()[0]
+        if len(dead):
+            timer = self.death_timer[dead] - dt
+            self.death_timer[dead] = timer
+            gone[dead] = timer <= 0
+        gone = gone.nonzero()[0]
+        if len(gone):
+            self.remove(gone)
+
+    def fire(self, fire, spawn_projectile_callback, player, level):
+        # mierenie s predstihom ide naraz, nahoda a vystrely v poradi nepriatelov
+        rng = self.rng
+        x = self.x[fire]
+        y = self.y[fire] + self.height[fire] // 2
+        speed = (6 + level * 0.3) * self.speed_mult[fire]
+        if player is not None:
+            t = 15
+            dx = player.x + player.vx * t - x
+            dy = player.y + player.vy * t - y
+            length = np.hypot(dx, dy)
+            length[length == 0] = 1.0
+            vx = (dx / length * speed).tolist()
+            vy = (dy / length * speed).tolist()
+
+        colors = self.color[fire].tolist()
+        for k, (i, sx, sy) in enumerate(zip(fire.tolist(), x.tolist(), y.tolist())):
+            self.cooldown[i] = rng.randint(30, 50)
+            if player is not None:
+                pvx = vx[k] + rng.uniform(-1.0, 1.0)
+                pvy = vy[k] + rng.uniform(-0.5, 0.5)
             else:
-                farba = "#ff8800"
-
-            self.canvas.create_oval(
-                self.x - r,
-                self.y - r,
-                self.x + r,
-                self.y + r,
-                fill=farba,
-                outline=""
-            )
-
-            if self.image_hit is not None:
-                img = self.image_hit if self.death_timer % 2 == 0 else self.image_normal
+                pvx = rng.uniform(-1.5, 1.5)
+                pvy = float(speed[k])
+            spawn_projectile_callback(sx, sy, pvx, pvy, color=self.colors[colors[k]])
+
+    def bboxes(self):
+        n = self.count
+        half_w = self.width[:n] // 2
+        half_h = self.height[:n] // 2
+        x = self.x[:n]
+        y = self.y[:n]
+        return x - half_w, y - half_h, x + half_w, y + half_h
+
+    def swept_hits(self, paths, r, masks=None):
+        # zasahy striel za tick ako (strela, cas, nepriatel) zoradene podla strely a casu.
+        # paths su riadky (x0, y0, x1, y1, min_x, min_y, max_x, max_y) drahy strely, strela je
+        # stvorec s polomerom r. Hruby test obdlznikov, ktore pokryvaju celu drahu strely aj
+        # nepriatela, ide maticou, pri vela dvojiciach cez sweep_pairs; presny test usecky ide
+        # len pre dvojice, co ho presli, s pohybom nepriatela odcitanym, takze sa rychla strela
+        # nepreskoci. masks su alfa masky po druhoch, s maskou sa zasah rata az od prveho
+        # nepriehladneho pixela
+        alive = (~self.dying[:self.count]).nonzero()[0]
+        if not len(alive) or not len(paths):
+            return []
+        hw = self.width[alive] // 2 + r
+        hh = self.height[alive] // 2 + r
+        px = self.prev_x[alive]
+        py = self.prev_y[alive]
+        x = self.x[alive]
+        y = self.y[alive]
+        x1 = np.minimum(px, x) - hw
+        x2 = np.maximum(px, x) + hw
+        y1 = np.minimum(py, y) - hh
+        y2 = np.maximum(py, y) + hh
+        if len(paths) * len(alive) <= SWEEP_PAIRS:
+            # pri malom pocte je cela matica lacnejsia ako triedenie
+            near = ((paths[:, 4, None] <= x2) & (paths[:, 6, None] >= x1) &
+                    (paths[:, 5, None] <= y2) & (paths[:, 7, None] >= y1))
+            rows, cols = near.nonzero()
+        else:
+            rows, cols = sweep_pairs(paths, x1, x2)
+            keep = (paths[rows, 5] <= y2[cols]) & (paths[rows, 7] >= y1[cols])
+            rows = rows[keep]
+            cols = cols[keep]
+        if not len(rows):
+            return []
+        # pohyb strely voci nepriatelovi sa pre kandidatov spocita naraz, po jednom
+        # v Pythone ide uz len test usecky, bez indexovania NumPy poli po prvkoch
+        sx = paths[rows, 0] - px[cols]
+        sy = paths[rows, 1] - py[cols]
+        dx = paths[rows, 2] - x[cols] - sx
+        dy = paths[rows, 3] - y[cols] - sy
+        index = alive[cols]
+        hits = []
+        for row, i, sx, sy, dx, dy, w, h, kind in zip(
+                rows.tolist(), index.tolist(), sx.tolist(), sy.tolist(), dx.tolist(), dy.tolist(),
+                hw[cols].tolist(), hh[cols].tolist(), self.kind[index].tolist()):
+            span = sweep(sx, sy, dx, dy, -w, -h, w, h)
+            if span is None:
+                continue
+            t = span[0]
+            mask = masks[kind] if masks is not None else None
+            if mask is not None:
+                t = mask.sweep_box(sx, sy, dx, dy, r, *span)
+                if t is None:
+                    continue
+            hits.append((row, t, i))
+        hits.sort()
+        return hits
+
+    def hits(self, bbox):
+        # indexy zivych nepriatelov, ktorych sa obdlznik dotyka, v poradi nepriatelov
+        if self.count == 0:
+            return ()
+        x1, y1, x2, y2 = self.bboxes()
+        bx1, by1, bx2, by2 = bbox
+        miss = (bx2 < x1) | (bx1 > x2) | (by2 < y1) | (by1 > y2)
+        miss |= self.dying[:self.count]
+        return (~miss).nonzero()[0]
+
+    def mask_hits(self, idx, mask, x, y, masks):
+        # z kandidatov od hits() tie, ktorych maska sa prekryva s maskou objektu so stredom x, y
+        found = []
+        for i in idx.tolist():
+            other = masks[self.kind[i]]
+            if other is None or mask.overlaps(other, float(self.x[i]) - x, float(self.y[i]) - y):
+                found.append(i)
+        return found
+
+    def draw(self, canvas, alpha=1.0):
+        # umierajuci nepriatel uz nema plamen, vybuch kreslia castice
+        n = self.count
+        while len(self.sprites) < n:
+            i = len(self.sprites)
+            self.effect_sprites.append(layer_item(
+                canvas, canvas.create_image(0, 0, state="hidden"), self.layer
+            ) if self.effect_frames else None)
+            if self.images[self.image[i]][0] is not None:
+                sprite = canvas.create_image(0, 0, state="hidden")
             else:
-                img = self.image_normal
+                sprite = canvas.create_oval(0, 0, 0, 0, outline="", state="hidden")
+            self.sprites.append(layer_item(canvas, sprite, self.layer))
+            self.drawn_image.append(None)
+            self.drawn_effect.append(None)
+            self.effect_shown.append(False)
+
+        if n:
+            xs = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha).tolist()
+            ys = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha).tolist()
+            images = self.image[:n].tolist()
+            dying = self.dying[:n].tolist()
+            timers = self.death_timer[:n].astype(int).tolist()
+            effects = self.effect_index[:n].tolist()
+            widths = self.width[:n].tolist()
+            heights = self.height[:n].tolist()
+            can_shoot = self.can_shoot[:n].tolist()
+
+        for i in range(n):
+            x = xs[i]
+            y = ys[i]
+            sprite = self.sprites[i]
+            image_normal, image_hit = self.images[images[i]]
+
+            effect_sprite = self.effect_sprites[i]
+            if effect_sprite is not None:
+                visible = self.show_effects and not dying[i]
+                if visible:
+                    eff = self.effect_frames[effects[i] % len(self.effect_frames)]
+                    if eff is not self.drawn_effect[i]:
+                        canvas.itemconfig(effect_sprite, image=eff)
+                        self.drawn_effect[i] = eff
+                    canvas.coords(effect_sprite, x, y)
+                if self.effect_shown[i] != visible:
+                    canvas.itemconfig(effect_sprite, state="normal" if visible else "hidden")
+                    self.effect_shown[i] = visible
+
+            if dying[i]:
+                img = image_normal
+                if image_hit is not None and timers[i] % 2 == 0:
+                    img = image_hit
+                if img is not None:
+                    if img is not self.drawn_image[i]:
+                        canvas.itemconfig(sprite, image=img)
+                        self.drawn_image[i] = img
+                    canvas.coords(sprite, x, y)
+                else:
+                    farba = "#ffcc33" if timers[i] % 2 == 0 else "#ff8800"
+                    if farba != self.drawn_image[i]:
+                        canvas.itemconfig(sprite, fill=farba)
+                        self.drawn_image[i] = farba
+                    w = widths[i] // 2
+                    h = heights[i] // 2
+                    canvas.coords(sprite, x - w, y - h, x + w, y + h)
+                continue
 
-            if img is not None:
-                self.sprite = self.canvas.create_image(self.x, self.y, image=img)
+            if image_normal is not None:
+                if image_normal is not self.drawn_image[i]:
+                    canvas.itemconfig(sprite, image=image_normal)
+                    self.drawn_image[i] = image_normal
+                canvas.coords(sprite, x, y)
             else:
-                self.sprite = self.canvas.create_oval(
-                    self.x - self.width // 2,
-                    self.y - self.height // 2,
-                    self.x + self.width // 2,
-                    self.y + self.height // 2,
-                    fill=farba,
-                    outline=""
-                )
+                farba = "red" if can_shoot[i] else "orange"
+                if farba != self.drawn_image[i]:
+                    canvas.itemconfig(sprite, fill=farba)
+                    self.drawn_image[i] = farba
+                r = min(widths[i], heights[i]) // 2
+                canvas.coords(sprite, x - r, y - r, x + r, y + r)
+
+        for i in range(self.shown, n):
+            canvas.itemconfig(self.sprites[i], state="normal")
+        for i in range(n, self.shown):
+            canvas.itemconfig(self.sprites[i], state="hidden")
+            if self.effect_shown[i]:
+                canvas.itemconfig(self.effect_sprites[i], state="hidden")
+                self.effect_shown[i] = False
+        self.shown = n
+
+    def undraw(self, canvas):
+        for items in (self.effect_sprites, self.sprites):
+            for item in items:
+                if item is not None:
+                    canvas.delete(item)
+        self.sprites = []
+        self.effect_sprites = []
+        self.drawn_image = []
+        self.drawn_effect = []
+        self.effect_shown = []
+        self.shown = 0
+
+
+class ProjectileManager:
+    # nepriatelske strely ako struct-of-arrays v NumPy, pohyb aj testy idu naraz pre vsetky
+    layer = "projectiles"
+
+    def __init__(self, capacity=256, size=8):
+        self.size = size
+        self.count = 0
+        self.colors = []
+        self.color_ids = {}
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.int16)
+
+        self.sprites = []
+        self.sprite_colors = []
+        self.shown = 0
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        return (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.color)
+
+    def grow(self):
+        capacity = len(self.x) * 2
+        for name in ("x", "y", "prev_x", "prev_y", "vx", "vy", "color"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, vx, vy, color="lightblue"):
+        if self.count == len(self.x):
+            self.grow()
+        color_id = self.color_ids.get(color)
+        if color_id is None:
+            color_id = len(self.colors)
+            self.colors.append(color)
+            self.color_ids[color] = color_id
+
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.color[i] = color_id
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt, world_width, world_height):
+        # mimo obrazovky sa strely mazu az tick po odchode, aby sa ich posledny krok
+        # este otestoval na zasah
+        n = self.count
+        if n == 0:
             return
+        x = self.x[:n]
+        y = self.y[:n]
+        keep = (x >= -50) & (x <= world_width + 50) & (y >= -50) & (y <= world_height + 50)
+        self.compact(keep)
+
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        y += self.vy[:n] * dt
+        x += self.vx[:n] * dt
+
+    def compact(self, keep):
+        # zmazane sloty sa odstrania naraz, poradie zivych striel ostava
+        if keep.all():
+            return
+        idx = np.flatnonzero(keep)
+        m = len(idx)
+        for arr in self.arrays():
+            arr[:m] = arr[idx]
+        self.count = m
+
+    def remove(self, indices):
+        keep = np.ones(self.count, dtype=bool)
+        keep[indices] = False
+        self.compact(keep)
+
+    def swept_hits(self, obj):
+        # strely, ktore sa pocas ticku dotkli hitboxu objektu (hraca), v poradi zasahu.
+        # Hruby test obdlznikov pokryvajucich drahu strely a objektu ide naraz, presny test
+        # usecky (pohyb strely voci objektu) len pre tie, co ho presli, a ak ma objekt
+        # masku, este test jej pixelov na useku drahy v hitboxe
+        n = self.count
+        if n == 0:
+            return []
+        s = self.size
+        x1, y1, x2, y2 = obj.hitbox
+        mask = obj.mask
+        ox0, oy0, ox, oy = obj.prev_x, obj.prev_y, obj.x, obj.y
+        px = self.prev_x[:n]
+        py = self.prev_y[:n]
+        x = self.x[:n]
+        y = self.y[:n]
+        near = ((np.minimum(px, x) <= max(ox0, ox) + x2 + s) &
+                (np.maximum(px, x) >= min(ox0, ox) + x1 - s) &
+                (np.minimum(py, y) <= max(oy0, oy) + y2 + s) &
+                (np.maximum(py, y) >= min(oy0, oy) + y1 - s))
+        idx = near.nonzero()[0]
+        sx = px[idx] - ox0
+        sy = py[idx] - oy0
+        dx = x[idx] - ox - sx
+        dy = y[idx] - oy - sy
+        hits = []
+        for i, sx, sy, dx, dy in zip(idx.tolist(), sx.tolist(), sy.tolist(),
+                                     dx.tolist(), dy.tolist()):
+            span = sweep(sx, sy, dx, dy, x1 - s, y1 - s, x2 + s, y2 + s)
+            if span is None:
+                continue
+            t = span[0]
+            if mask is not None:
+                t = mask.sweep_box(sx, sy, dx, dy, s, *span)
+                if t is None:
+                    continue
+            hits.append((t, i))
+        hits.sort()
+        return [i for _, i in hits]
+
+    def draw(self, canvas, alpha=1.0):
+        # canvas polozky sa neviazu na konkretnu strelu, slot i vzdy kresli i-tu strelu
+        n = self.count
+        while len(self.sprites) < n:
+            self.sprites.append(layer_item(
+                canvas,
+                canvas.create_line(0, 0, 0, 0, width=5, state="hidden"),
+                self.layer
+            ))
+            self.sprite_colors.append(None)
+
+        if n:
+            dlzka = 25
+            x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+            y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+            vlen = np.hypot(self.vx[:n], self.vy[:n])
+            vlen[vlen == 0] = 1
+            x2 = x + self.vx[:n] / vlen * dlzka
+            y2 = y + self.vy[:n] / vlen * dlzka
+
+            colors = self.color[:n].tolist()
+            for i, (ax, ay, bx, by) in enumerate(zip(x.tolist(), y.tolist(), x2.tolist(), y2.tolist())):
+                item = self.sprites[i]
+                canvas.coords(item, ax, ay, bx, by)
+                if colors[i] != self.sprite_colors[i]:
+                    canvas.itemconfig(item, fill=self.colors[colors[i]])
+                    self.sprite_colors[i] = colors[i]
+
+        for i in range(self.shown, n):
+            canvas.itemconfig(self.sprites[i], state="normal")
+        for i in range(n, self.shown):
+            canvas.itemconfig(self.sprites[i], state="hidden")
+        self.shown = n
+
+    def undraw(self, canvas):
+        for item in self.sprites:
+            canvas.delete(item)
+        self.sprites = []
+        self.sprite_colors = []
+        self.shown = 0
+
+
+class ParticleSystem:
+    # castice efektov v poliach s pevnou kapacitou, slot i vzdy kresli i-tu casticu.
+    # Za jeden snimok smie vzniknut najviac budget castic; ked sa rozpocet minie,
+    # dalsie vybuchy su redsie, ale snimok sa nepredlzi
+    layer = "particles"
+
+    def __init__(self, capacity=512, budget=160, drag=0.92, gravity=0.05, seed=None):
+        self.capacity = capacity
+        self.budget = budget
+        self.drag = drag
+        self.gravity = gravity
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.spawned = 0
+        self.dropped = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.size = np.zeros(capacity)
+        self.palette = np.zeros(capacity, dtype=np.int16)
+
+        # paleta ide od najhorucejsej farby po vyhasinajucu, farba sa vyberie podla veku
+        self.palettes = []
+        self.palette_ids = {}
+        self.palette_len = np.zeros(0, dtype=np.int16)
+
+        self.sprites = []
+        self.sprite_colors = []
+        self.shown = 0
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        return (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy,
+                self.life, self.max_life, self.size, self.palette)
+
+    def palette_id(self, palette):
+        index = self.palette_ids.get(palette)
+        if index is None:
+            index = len(self.palettes)
+            self.palettes.append(palette)
+            self.palette_ids[palette] = index
+            self.palette_len = np.append(self.palette_len, len(palette)).astype(np.int16)
+        return index
+
+    def burst(self, x, y, count, palette, speed=(1.0, 6.0), life=(10, 25), size=(2.0, 5.0)):
+        # kym je minuta menej nez polovica rozpoctu aj poolu, vybuch je cely, potom sa
+        # zmensuje umerne tomu, co zostava; vrati pocet castic, ktore naozaj vznikli
+        left = self.budget - self.spawned
+        free = self.capacity - self.count
+        share = min(1.0, 2 * min(left / self.budget, free / self.capacity))
+        allowed = min(math.ceil(count * share), left, free)
+        if allowed <= 0:
+            self.dropped += count
+            return 0
+        self.dropped += count - allowed
+        self.spawned += allowed
+
+        rng = self.rng
+        i = self.count
+        j = i + allowed
+        angle = rng.uniform(0, 2 * math.pi, allowed)
+        v = rng.uniform(speed[0], speed[1], allowed)
+        self.x[i:j] = self.prev_x[i:j] = x
+        self.y[i:j] = self.prev_y[i:j] = y
+        self.vx[i:j] = np.cos(angle) * v
+        self.vy[i:j] = np.sin(angle) * v
+        self.life[i:j] = self.max_life[i:j] = rng.uniform(life[0], life[1], allowed)
+        self.size[i:j] = rng.uniform(size[0], size[1], allowed)
+        self.palette[i:j] = self.palette_id(palette)
+        self.count = j
+        return allowed
+
+    def clear(self):
+        self.count = 0
+
+    def update(self, dt=1.0):
+        n = self.count
+        if n == 0:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vx[:n] * dt
+        y += self.vy[:n] * dt
+        drag = self.drag ** dt
+        self.vx[:n] *= drag
+        vy = self.vy[:n]
+        vy *= drag
+        vy += self.gravity * dt
+        life = self.life[:n]
+        life -= dt
+
+        dead = (life <= 0).nonzero()[0]
+        if len(dead):
+            keep = np.ones(n, dtype=bool)
+            keep[dead] = False
+            idx = keep.nonzero()[0]
+            m = len(idx)
+            for arr in self.arrays():
+                arr[:m] = arr[idx]
+            self.count = m
+
+    def draw(self, canvas, alpha=1.0):
+        # rozpocet sa pocita po snimkoch, kreslenie je koniec snimku
+        self.spawned = 0
+        n = self.count
+        while len(self.sprites) < n:
+            self.sprites.append(layer_item(
+                canvas,
+                canvas.create_oval(0, 0, 0, 0, outline="", state="hidden"),
+                self.layer
+            ))
+            self.sprite_colors.append(None)
+
+        if n:
+            ratio = self.life[:n] / self.max_life[:n]
+            x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+            y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+            r = self.size[:n] * (0.3 + 0.7 * ratio)
+            palette = self.palette[:n]
+            plen = self.palette_len[palette]
+            shade = np.minimum(((1 - ratio) * plen).astype(np.int16), plen - 1)
+            # farba ako jedno cislo, aby sa dala porovnat s tym, co uz polozka ma
+            codes = (palette.astype(np.int32) * 256 + shade).tolist()
+
+            palettes = self.palettes
+            for i, (x1, y1, x2, y2, code) in enumerate(zip((x - r).tolist(), (y - r).tolist(),
+                                                           (x + r).tolist(), (y + r).tolist(),
+                                                           codes)):
+                item = self.sprites[i]
+                canvas.coords(item, x1, y1, x2, y2)
+                if code != self.sprite_colors[i]:
+                    canvas.itemconfig(item, fill=palettes[code >> 8][code & 255])
+                    self.sprite_colors[i] = code
+
+        for i in range(self.shown, n):
+            canvas.itemconfig(self.sprites[i], state="normal")
+        for i in range(n, self.shown):
+            canvas.itemconfig(self.sprites[i], state="hidden")
+        self.shown = n
+
+    def undraw(self, canvas):
+        for item in self.sprites:
+            canvas.delete(item)
+        self.sprites = []
+        self.sprite_colors = []
+        self.shown = 0
 
-        if self.image_normal:
-            self.sprite = self.canvas.create_image(self.x, self.y, image=self.image_normal)
-        else:
-            farba = "red" if self.can_shoot else "orange"
-            r = min(self.width, self.height) // 2
-            self.sprite = self.canvas.create_oval(
-                self.x - r,
-                self.y - r,
-                self.x + r,
-                self.y + r,
-                fill=farba,
-                outline=""
-            )
-
-    def get_bbox(self):
-        return (self.x - self.width // 2,
-                self.y - self.height // 2,
-                self.x + self.width // 2,
-                self.y + self.height // 2)
-
-class Projectile:
-    def __init__(self, canvas, x, y, vx=0, vy=7, color="lightblue"):
-        self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.vy = vy
-        self.vx = vx
-        self.size = 8
-        self.sprite = None
-        self.color = color
-
-    def update(self):
-        self.y += self.vy
-        self.x += self.vx
 
-    def draw(self):
-        if self.sprite is not None:
-            self.canvas.delete(self.sprite)
-        dlzka = 25
-        vlen = (self.vx**2+self.vy**2)**0.5
-        if vlen == 0:
-            vlen =1
-
-        dx = self.vx / vlen * dlzka
-        dy = self.vy / vlen * dlzka
-        self.sprite = self.canvas.create_line(
-            self.x,self.y,
-            self.x+dx, self.y+dy,
-            width=5,
-            fill=self.color)
+class PlayerBullet:
+    layer = "bullets"
+    radius = 10
 
-    def get_bbox(self):
-        return (self.x - self.size,
-                self.y - self.size,
-                self.x + self.size,
-                self.y + self.size)
+    def __init__(self, *args, **kwargs):
+        self.sprite = None
+        self.reset(*args, **kwargs)
 
-class PlayerBullet:
-    def __init__(self, canvas, x, y, vx, vy, color="green", frames_pil = None):
-        self.canvas = canvas
+    def reset(self, x, y, vx, vy, color="green", atlas = None):
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         self.vx = vx
         self.vy = vy
         self.color = color
         self.length = 40
-        self.sprite = None
 
-        self.frames_pil = frames_pil or []
+        # strela leti rovno, takze uhol sa urci iba raz pri vystrele
+        self.atlas = atlas
+        self.angle_bucket = None
+        if self.atlas is not None:
+            self.angle_bucket = atlas.bucket(math.degrees(math.atan2(vy, vx)))
         self.anim_index = 0
         self.anim_speed = 2
         self.anim_counter = 0
         self.tk_image = None
+        self.drawn_key = None
 
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
+    def update(self, dt=1.0):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.x += self.vx * dt
+        self.y += self.vy * dt
 
-    def draw(self):
-        if self.sprite is not None:
-            self.canvas.delete(self.sprite)
-
-        if self.frames_pil:
-            self.anim_counter += 1
+        if self.atlas is not None:
+            self.anim_counter += dt
             if self.anim_counter >= self.anim_speed:
-                self.anim_counter = 0
-                self.anim_index = (self.anim_index + 1) % len(self.frames_pil)
-            base = self.frames_pil[self.anim_index]
-            angle = math.degrees(math.atan2(self.vy, self.vx))
-            rotated = base.rotate(-angle, expand=True)
-            self.tk_image = ImageTk.PhotoImage(rotated)
-            self.sprite = self.canvas.create_image(
-                self.x,
-                self.y,
-                image=self.tk_image
-            )
+                self.anim_counter -= self.anim_speed
+                self.anim_index = (self.anim_index + 1) % len(self.atlas.frames)
+
+    def draw(self, canvas, alpha=1.0):
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        if self.atlas is not None:
+            # obrazok sa meni len pri dalsom snimku animacie, inak sa polozka iba posunie
+            key = (self.atlas.draw_bucket(self.angle_bucket), self.anim_index)
+            if key != self.drawn_key:
+                self.tk_image = self.atlas.photo(*key)
+            if self.sprite is None:
+                self.sprite = layer_item(
+                    canvas,
+                    canvas.create_image(x, y, image=self.tk_image),
+                    self.layer
+                )
+            else:
+                if key != self.drawn_key:
+                    canvas.itemconfig(self.sprite, image=self.tk_image)
+                canvas.coords(self.sprite, x, y)
+            self.drawn_key = key
         else:
             vlen = (self.vx ** 2 + self.vy ** 2) ** 0.5 or 1
             dlzka = 40
             dx = self.vx / vlen * dlzka
             dy = self.vy / vlen * dlzka
 
-            self.sprite = self.canvas.create_line(
-                self.x,
-                self.y,
-                self.x + dx,
-                self.y + dy,
-                width=10,
-                fill=self.color
-            )
+            if self.sprite is None:
+                self.sprite = layer_item(
+                    canvas,
+                    canvas.create_line(
+                        x,
+                        y,
+                        x + dx,
+                        y + dy,
+                        width=10,
+                        fill=self.color
+                    ),
+                    self.layer
+                )
+            else:
+                canvas.coords(self.sprite, x, y, x + dx, y + dy)
+
+    def undraw(self, canvas):
+        if self.sprite is not None:
+            canvas.delete(self.sprite)
+            self.sprite = None
+            self.drawn_key = None
 
     def get_bbox(self):
-        r = 10
+        r = self.radius
         return (self.x - r,
                 self.y - r,
                 self.x + r,
                 self.y + r)
 
 class Shield:
-    def __init__(self, canvas, x, y, image=None, radius=25):
-        self.canvas = canvas
+    layer = "shields"
+
+    def __init__(self, *args, **kwargs):
+        self.sprite = None
+        self.drawn_pos = None
+        self.reset(*args, **kwargs)
+
+    def reset(self, x, y, image=None, radius=25, size=None):
         self.x = x
         self.y = y
-        self.sprite = None
         self.image = image
 
-        if self.image is not None:
+        if size is not None:
+            self.width, self.height = size
+        elif self.image is not None:
             self.width = self.image.width()
             self.height = self.image.height()
         else:
@@ -379,19 +1583,28 @@ class Shield:
             self.y + self.height // 2
         )
 
-    def draw(self):
+    def draw(self, canvas):
+        # shield sa nehybe, polozka sa posunie iba ked sa objekt z poolu pouzije znova
         if self.sprite is not None:
-            self.canvas.delete(self.sprite)
+            if self.drawn_pos != (self.x, self.y):
+                r = self.width // 2
+                if self.image is not None:
+                    canvas.coords(self.sprite, self.x, self.y)
+                else:
+                    canvas.coords(self.sprite, self.x - r, self.y - r, self.x + r, self.y + r)
+                self.drawn_pos = (self.x, self.y)
+            return
+        self.drawn_pos = (self.x, self.y)
 
         if self.image is not None:
-            self.sprite = self.canvas.create_image(
+            self.sprite = canvas.create_image(
                 self.x,
                 self.y,
                 image=self.image
             )
         else:
             r = self.width // 2
-            self.sprite = self.canvas.create_oval(
+            self.sprite = canvas.create_oval(
                 self.x - r,
                 self.y - r,
                 self.x + r,
@@ -399,10 +1612,696 @@ class Shield:
                 outline="cyan",
                 width=3
             )
+        layer_item(canvas, self.sprite, self.layer)
 
+    def undraw(self, canvas):
+        if self.sprite is not None:
+            canvas.delete(self.sprite)
+            self.sprite = None
+
+
+BASE_TICK_RATE = 40
+
+# krivka obtiaznosti, World si berie kopiu a ladenie (tuning.py) ju prepisuje
+DIFFICULTY = {
+    "score_per_level": 10,
+    # do tohto levelu len zakladni nepriatelia, potom vahy basic / zigzag / chaser
+    "basic_until": 2,
+    "weights_mid": (0.4, 0.35, 0.25),
+    "high_from": 5,
+    "weights_high": (0.25, 0.4, 0.35),
+    # sanca na strelca: base + step * level, najviac max
+    "shoot_base": 0.5,
+    "shoot_step": 0.05,
+    "shoot_max": 0.8,
+    # zvisla rychlost je randint(vy_min, vy_base + level)
+    "vy_min": 2,
+    "vy_base": 3,
+    # pauza medzi nepriatelmi v povodnych tickoch: spawn_base - spawn_step * level, najmenej floor
+    "spawn_base": 50,
+    "spawn_step": 5,
+    "spawn_floor": 25,
+}
+
+
+class Pool:
+    # volny zoznam pouzitych objektov, pri dalsom spawne sa len resetnu
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.created = 0
+
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+        else:
+            obj = self.factory(*args, **kwargs)
+            self.created += 1
+        return obj
+
+    def release(self, obj):
+        self.free.append(obj)
+
+    def release_all(self, objs):
+        self.free.extend(objs)
+
+
+def compact(items, dead, pool):
+    # oznacene objekty sa odstrania jednym prechodom a vratia do poolu, poradie ostatnych ostava
+    alive = 0
+    for obj in items:
+        if obj in dead:
+            pool.release(obj)
+        else:
+            items[alive] = obj
+            alive += 1
+    del items[alive:]
+
+
+class Timer:
+    __slots__ = ("due", "callback", "args", "bucket")
+
+    def __init__(self, due, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.bucket = None
+
+
+class TimerWheel:
+    # hierarchicke casovacove koleso po tickoch sveta: uroven 0 ma sloty po jednom ticku,
+    # kazda dalsia po 64-nasobku; casovac sa presuva nizsie, az ked sa k nemu koleso dotoci.
+    # Sloty su dict, takze pridanie aj zrusenie je O(1) a poradie v slote ostava
+    bits = 6
+    levels = 4
 
-class Program:
     def __init__(self):
+        self.size = 1 << self.bits
+        self.mask = self.size - 1
+        self.wheels = [[{} for _ in range(self.size)] for _ in range(self.levels)]
+        self.now = 0
+        self.pending = 0
+
+    def __len__(self):
+        return self.pending
+
+    def schedule(self, delay, callback, *args):
+        # delay je v tickoch, najmenej 1, teda najskor v dalsom ticku
+        timer = Timer(self.now + max(1, int(delay)), callback, args)
+        self.insert(timer)
+        self.pending += 1
+        return timer
+
+    def insert(self, timer):
+        due = timer.due
+        now = self.now
+        for level in range(self.levels):
+            shift = self.bits * (level + 1)
+            # na tejto urovni, ked sa cas od teraz po due nepreklopi cez vyssiu uroven
+            if due >> shift == now >> shift:
+                bucket = self.wheels[level][(due >> (shift - self.bits)) & self.mask]
+                bucket[timer] = None
+                timer.bucket = bucket
+                return
+        raise ValueError(f"casovac o {due - now} tickov je prilis dlhy")
+
+    def cancel(self, timer):
+        if timer is not None and timer.bucket is not None:
+            del timer.bucket[timer]
+            timer.bucket = None
+            self.pending -= 1
+
+    def clear(self):
+        for wheel in self.wheels:
+            for bucket in wheel:
+                for timer in bucket:
+                    timer.bucket = None
+                bucket.clear()
+        self.now = 0
+        self.pending = 0
+
+    def advance(self):
+        # jeden tick: vyssie urovne sa rozsypu nizsie, potom sa zavolaju casovace na rade
+        self.now += 1
+        now = self.now
+        for level in range(1, self.levels):
+            if now & ((1 << (self.bits * level)) - 1):
+                break
+            bucket = self.wheels[level][(now >> (self.bits * level)) & self.mask]
+            timers = list(bucket)
+            bucket.clear()
+            for timer in timers:
+                self.insert(timer)
+
+        bucket = self.wheels[0][now & self.mask]
+        if not bucket:
+            return
+        due = list(bucket)
+        bucket.clear()
+        for timer in due:
+            timer.bucket = None
+        self.pending -= len(due)
+        for timer in due:
+            timer.callback(*timer.args)
+
+
+def load_player_image(path="pngwing.com.png"):
+    return load_image(path, (60, 60))
+
+
+def load_player_rotations(path="pngwing.com.png", buckets=72):
+    rotations = RotationCache([load_player_image(path)], buckets=buckets, offset=-90)
+    rotations.prerotate()
+    return rotations
+
+
+def load_enemy_images(path="pngwing2.png", size=(60, 60)):
+    img_e = load_image(path, size)
+
+    overlay = Image.new("RGBA", img_e.size, (255, 140, 0, 160))
+    tinted = Image.alpha_composite(img_e, overlay)
+
+    overlay_chaser = Image.new("RGBA", img_e.size, (120, 255, 120, 160))
+    alpha_mask = img_e.split()[3]
+    overlay_chaser.putalpha(alpha_mask)
+    chaser_tinted = Image.alpha_composite(img_e, overlay_chaser)
+    return img_e, tinted, chaser_tinted
+
+
+def enemy_masks(img_e, tinted, chaser_tinted):
+    # alfa masky pod tymi istymi klucmi ako obrazky vo World.images
+    return {"enemy_normal": AlphaMask(img_e),
+            "enemy_hit": AlphaMask(tinted),
+            "enemy_chaser": AlphaMask(chaser_tinted)}
+
+
+def load_enemy_masks(path="pngwing2.png", size=(60, 60)):
+    return enemy_masks(*load_enemy_images(path, size))
+
+
+class World:
+    # herne pravidla bez Tkinteru, vykreslovanie je volitelna vrstva nad tym
+    def __init__(self, width, height, player_img=None, images=None, rotation_buckets=72,
+                 tick_rate=BASE_TICK_RATE, difficulty=None, masks=None):
+        self.width = width
+        self.height = height
+        # rychlosti a casovace su v povodnych 25 ms tickoch, dt ich prepocita na zvoleny tick
+        self.tick_rate = tick_rate
+        self.dt = BASE_TICK_RATE / tick_rate
+        self.line_y = height // 4
+        self.images = images or {}
+        self.enemy_size = (60, 60)
+        self.shield_size = (50, 50)
+        self.difficulty = dict(DIFFICULTY)
+        if difficulty:
+            self.difficulty.update(difficulty)
+
+        self.player = Player(width // 2, height - 50,
+                             base_img=player_img,
+                             rotation_buckets=rotation_buckets)
+
+        self.bullet_pool = Pool(PlayerBullet)
+        self.shield_pool = Pool(Shield)
+
+        self.crosshair_x = width // 2
+        self.crosshair_y = height // 2
+        self.crosshair_active = True
+
+        # vsetka nahoda sveta ide z tohto generatora, seed sa meni s kazdou hrou
+        self.rng = random.Random()
+        self.seed = None
+
+        self.enemies = EnemyManager(rng=self.rng)
+        self.projectiles = ProjectileManager()
+        self.player_bullets = []
+        self.shields = []
+        self.has_shield = False
+
+        self.max_lives = 3
+        self.lives = self.max_lives
+        self.invincible = False
+        self.blink_count = 0
+        self.score = 0
+        self.level = 1
+        self.game_mode = "hardcore"
+        self.game_over = False
+        self.max_fire_cooldown = 20
+        # tick, od ktoreho sa da znova vystrelit
+        self.fire_ready = 0
+        self.on_game_over = None
+        # efekty (vybuchy, praskly stit, zasah hraca) su len vizualne, svet ich iba ohlasi
+        self.on_effect = None
+
+        # vsetky casovace hry idu cez koleso, takze stoja s pauzou a reset ich zmaze
+        self.timers = TimerWheel()
+        self.shield_timer = None
+        self.shield_delay = 0
+        # rozpis vln z wave_table.py, bez neho sa nepriatelia losuju podla levelu
+        self.waves = None
+        self.wave_ticks = []
+        self.wave_index = 0
+        # alfa masky nepriatelov podla druhu, bez nich sa zasahy beru podla obdlznikov
+        self.set_masks(masks)
+
+    def set_masks(self, masks):
+        # masky su pod klucmi obrazkov, zivy nepriatel sa testuje maskou svojho obrazka;
+        # None vypne test pixelov pre vsetkych, aj pre hraca
+        masks = masks or {}
+        self.kind_masks = [masks.get(spec.image) for spec in ENEMY_TYPES.values()]
+        self.player.set_use_mask(bool(masks))
+
+    def set_waves(self, waves):
+        # casy rozpisu sa raz prepocitaju na ticky, prejavi sa od dalsieho reset_game
+        self.waves = waves
+        self.wave_ticks = []
+        if waves is not None:
+            self.wave_ticks = [max(1, round(e[0] * self.tick_rate)) for e in waves.entries]
+
+    def reset_game(self, game_mode=None, seed=None):
+        if game_mode is not None:
+            self.game_mode = game_mode
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.bullet_pool.release_all(self.player_bullets)
+        self.shield_pool.release_all(self.shields)
+        self.enemies.clear()
+        self.projectiles.clear()
+        self.player_bullets.clear()
+        self.shields.clear()
+        self.has_shield = False
+
+        self.score = 0
+        self.level = 1
+        # cely stav sa vracia na zaciatok, aby nova hra nezavisela od predchadzajucej
+        self.player.teleport(self.width // 2, self.height - 50)
+        self.player.vx = 0
+        self.player.vy = 0
+        self.player.set_angle(0)
+        self.lives = self.max_lives
+        self.game_over = False
+        self.invincible = False
+        self.blink_count = 0
+        self.player.visible = True
+        self.timers.clear()
+        self.fire_ready = 0
+        self.wave_index = 0
+        if self.wave_ticks:
+            self.timers.schedule(self.wave_ticks[0], self.wave_tick)
+        else:
+            self.timers.schedule(1, self.spawn_tick)
+        self.shield_timer = self.timers.schedule(self.ticks(100), self.shield_tick)
+        if self.game_mode == "hardcore":
+            self.lives = 1
+        else:
+            self.lives = self.max_lives
+
+    def fire_bullet(self):
+        if not self.crosshair_active:
+            return
+
+        if self.timers.now < self.fire_ready:
+            return
+        dx = self.crosshair_x - self.player.x
+        dy = self.crosshair_y - self.player.y
+
+        if dx == 0 and dy == 0:
+            return
+        speed = 20
+
+        length = (dx ** 2 + dy ** 2) ** 0.5
+        vx = dx / length * speed
+        vy = dy / length * speed
+
+        bullet = self.bullet_pool.acquire(
+            self.player.x,
+            self.player.y,
+            vx,
+            vy,
+            color="cyan",
+            atlas=self.images.get("laser_atlas")
+        )
+        self.player_bullets.append(bullet)
+
+        self.fire_ready = self.timers.now + self.ticks(self.max_fire_cooldown)
+
+    @property
+    def fire_cooldown(self):
+        # zostatok v povodnych tickoch, z neho sa kresli ukazovatel v HUD
+        return max(0, self.fire_ready - self.timers.now) * self.dt
+
+    def ticks(self, base_ticks):
+        # casy su v povodnych 25 ms tickoch, koleso pocita ticky zvolenej frekvencie
+        return max(1, math.ceil(base_ticks / self.dt - 1e-9))
+
+    def spawn_tick(self):
+        self.spawn_enemy()
+        d = self.difficulty
+        delay = max(d["spawn_floor"], d["spawn_base"] - self.level * d["spawn_step"])
+        self.timers.schedule(self.ticks(delay), self.spawn_tick)
+
+    def wave_tick(self):
+        # vsetky polozky rozpisu s tymto tickom naraz, potom sa naplanuje dalsi
+        entries = self.waves.entries
+        ticks = self.wave_ticks
+        i = self.wave_index
+        due = ticks[i]
+        while i < len(entries) and ticks[i] == due:
+            _, kind, x, y, vx, vy, can_shoot = entries[i]
+            self.spawn_kind(kind, x, y, vx, vy, can_shoot)
+            i += 1
+        self.wave_index = i
+        if i < len(entries):
+            self.timers.schedule(ticks[i] - due, self.wave_tick)
+        elif self.waves.then == "loop":
+            self.wave_index = 0
+            self.timers.schedule(ticks[0], self.wave_tick)
+        elif self.waves.then == "endless":
+            self.timers.schedule(1, self.spawn_tick)
+
+    def shield_tick(self):
+        # s 5 stitmi na ploche odpocet stoji, spusti sa az ked hrac jeden zoberie
+        self.spawn_shield()
+        self.shield_delay = self.ticks(self.rng.randint(100, 300))
+        self.shield_timer = None
+        if len(self.shields) < 5:
+            self.shield_timer = self.timers.schedule(self.shield_delay, self.shield_tick)
+
+    def spawn_enemy(self):
+        line_y = self.line_y
+        d = self.difficulty
+
+        if self.rng.random() < 0.2:
+            side = self.rng.choice(["left", "right"])
+            y = self.rng.randint(line_y + 50, self.height - 50)
+            vy = 0
+            speed = self.rng.randint(3, 6)
+            if side == "left":
+                x = -40
+                vx = speed
+            else:
+                x = self.width + 40
+                vx = -speed
+        else:
+            x = self.rng.randint(30, self.width - 30)
+            y = -20
+            vy = self.rng.randint(d["vy_min"], d["vy_base"] + self.level)
+            vx = 0
+
+        shoot_chance = min(d["shoot_base"] + self.level * d["shoot_step"], d["shoot_max"])
+        can_shoot = self.rng.random() < shoot_chance
+
+        if self.level <= d["basic_until"]:
+            kind = "basic"
+        else:
+            if self.level < d["high_from"]:
+                weights = d["weights_mid"]
+            else:
+                weights = d["weights_high"]
+            kind = self.rng.choices(ENEMY_KINDS, weights=weights)[0]
+
+        self.spawn_kind(kind, x, y, vx, vy, can_shoot)
+
+    def spawn_kind(self, kind, x, y, vx, vy, can_shoot):
+        # obrazky, farba a rychlost striel idu z registra druhov
+        spec = ENEMY_TYPES[kind]
+        self.enemies.spawn(
+            x, y, vy,
+            can_shoot=can_shoot and spec.shoots,
+            image_normal=self.images.get(spec.image),
+            image_hit=self.images.get(spec.hit_image),
+            vx=vx,
+            effect_frames=self.images.get("enemy_effect"),
+            kind=kind,
+            projectile_color=spec.projectile_color,
+            projectile_speed_mult=spec.projectile_speed,
+            size=self.enemy_size
+        )
+
+    def spawn_shield(self):
+        line_y = self.line_y
+
+        x = self.rng.randint(50, self.width - 50)
+        y = self.rng.randint(line_y + 50, self.height - 80)
+
+        shield = self.shield_pool.acquire(x, y, image=self.images.get("shield"), size=self.shield_size)
+        self.shields.append(shield)
+
+    def spawn_projectile(self, x, y, vx,vy, color = "lightblue"):
+        self.projectiles.spawn(x, y, vx, vy, color=color)
+
+    def check_collision(self, bbox1, bbox2):
+        x1a, y1a, x1b, y1b = bbox1
+        x2a, y2a, x2b, y2b = bbox2
+        return not (x1b < x2a or x1a > x2b or y1b < y2a or y1a > y2b)
+
+    def tick_game(self):
+        self.level = 1 + self.score // self.difficulty["score_per_level"]
+        self.timers.advance()
+
+        self.player.update(self.width,self.height, self.dt)
+        dx = self.crosshair_x - self.player.x
+        dy = self.crosshair_y - self.player.y
+        if dx != 0 or dy != 0:
+            self.player.set_angle(math.degrees(math.atan2(dy, dx)))
+
+        self.enemies.update(
+            self.spawn_projectile,
+            self.width,
+            self.height,
+            player=self.player,
+            level=self.level,
+            dt=self.dt
+        )
+
+        self.projectiles.update(self.dt, self.width, self.height)
+
+        # zoznamy sa zhutnuju na mieste: zive objekty sa posunu dopredu, zvysok ide do poolu;
+        # strela mimo obrazovky odide az tick po tom, co jej posledny krok presiel kolizami
+        bullets = self.player_bullets
+        alive = 0
+        for b in bullets:
+            if (b.x < -50 or b.x > self.width + 50 or
+                    b.y < -50 or b.y > self.height + 50):
+                self.bullet_pool.release(b)
+            else:
+                b.update(self.dt)
+                bullets[alive] = b
+                alive += 1
+        del bullets[alive:]
+
+        self.collide_bullets()
+
+        player_bb = self.player.get_bbox()
+
+        # stitov je na ploche najviac par, staci ich prejst rovno
+        if not self.has_shield:
+            for sh in self.shields:
+                if self.check_collision(player_bb, sh.get_bbox()):
+                    self.has_shield = True
+                    compact(self.shields, {sh}, self.shield_pool)
+                    if self.shield_timer is None:
+                        self.shield_timer = self.timers.schedule(self.shield_delay, self.shield_tick)
+                    break
+
+        if not self.invincible:
+            hits = self.enemies.hits(player_bb)
+            if len(hits) and self.player.mask is not None:
+                hits = self.enemies.mask_hits(hits, self.player.mask,
+                                              self.player.x, self.player.y, self.kind_masks)
+            if len(hits):
+                self.hit_player()
+                return
+
+            hits = self.projectiles.swept_hits(self.player)
+            if len(hits):
+                # prvu strelu zachyti stit, kazda dalsia uz zasiahne hraca
+                if self.has_shield:
+                    self.has_shield = False
+                    self.effect("shield_pop", self.player.x, self.player.y)
+                    self.projectiles.remove(hits[:1])
+                    if len(hits) > 1:
+                        self.hit_player()
+                        return
+                else:
+                    self.hit_player()
+                    return
+
+    def collide_bullets(self):
+        bullets = self.player_bullets
+        enemies = self.enemies
+        if not bullets or not enemies.count:
+            return
+        # strely sa prechadzaju v poradi a kazda zabije prveho nepriatela, do ktoreho
+        # na svojej drahe za tento tick narazila
+        ends = np.array([(b.prev_x, b.prev_y, b.x, b.y) for b in bullets])
+        paths = np.hstack((ends, np.minimum(ends[:, :2], ends[:, 2:]),
+                           np.maximum(ends[:, :2], ends[:, 2:])))
+
+        spent = set()
+        for row, _, i in enemies.swept_hits(paths, PlayerBullet.radius, self.kind_masks):
+            bullet = bullets[row]
+            if bullet in spent or enemies.dying[i]:
+                continue
+            enemies.start_dying(i)
+            self.effect("enemy_death", enemies.x[i], enemies.y[i])
+            spent.add(bullet)
+            self.score += 1
+        if spent:
+            compact(bullets, spent, self.bullet_pool)
+
+    def hit_player(self):
+        self.has_shield = False
+        self.lives -= 1
+        self.effect("player_hit", self.player.x, self.player.y)
+
+        if self.lives <= 0:
+            self.end_game()
+            return
+
+        self.player.teleport(self.width // 2, self.height - 50)
+        self.player.vx = 0
+        self.player.vy = 0
+        self.projectiles.clear()
+
+        self.invincible = True
+        self.blink_count = 10
+        self.player.visible = True
+        self.blink_player()
+
+    def blink_player(self):
+        # blikanie ide po tickoch (4 ticky = 100 ms), takze sa zastavi s pauzou
+        self.player.visible = not self.player.visible
+        self.blink_count -= 1
+
+        if self.blink_count > 0:
+            self.timers.schedule(self.ticks(4), self.blink_player)
+        else:
+            self.player.visible = True
+            self.invincible = False
+
+    def effect(self, name, x, y):
+        if self.on_effect is not None:
+            self.on_effect(name, float(x), float(y))
+
+    def end_game(self):
+        self.game_over = True
+        if self.on_game_over is not None:
+            self.on_game_over()
+
+    def apply_input(self, flags, crosshair_x, crosshair_y):
+        # vstup jedneho ticku, ziva hra aj prehravanie zaznamu idu touto cestou
+        speed = self.player.speed
+        self.player.vx = -speed if flags & KEY_LEFT else speed if flags & KEY_RIGHT else 0
+        self.player.vy = -speed if flags & KEY_UP else speed if flags & KEY_DOWN else 0
+        self.crosshair_active = bool(flags & CROSSHAIR)
+        self.crosshair_x = crosshair_x
+        self.crosshair_y = crosshair_y
+        if flags & FIRE:
+            self.fire_bullet()
+
+    def state_digest(self):
+        # otlacok stavu sveta, zaznam a jeho prehratie sa musia zhodovat bit po bite
+        digest = zlib.crc32(struct.pack("<iiidd", self.score, self.level, self.lives,
+                                        self.player.x, self.player.y))
+        n = self.enemies.count
+        # dvojice x, y po nepriateloch
+        digest = zlib.crc32(np.column_stack((self.enemies.x[:n], self.enemies.y[:n])).tobytes(),
+                            digest)
+        n = self.projectiles.count
+        digest = zlib.crc32(self.projectiles.x[:n].tobytes(), digest)
+        digest = zlib.crc32(self.projectiles.y[:n].tobytes(), digest)
+        return digest
+
+
+def run_headless(ticks, width=1280, height=720, game_mode="classic", tick_rate=BASE_TICK_RATE,
+                 waves=None):
+    world = World(width, height, player_img=load_player_image(), tick_rate=tick_rate,
+                  masks=load_enemy_masks())
+    if waves:
+        world.set_waves(load_waves(waves, width, height, ENEMY_KINDS))
+    world.reset_game(game_mode)
+    games = 1
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        world.tick_game()
+        if world.game_over:
+            world.reset_game()
+            games += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{ticks} tickov za {elapsed:.2f} s "
+          f"({ticks / elapsed:.0f} tickov/s), odohranych hier: {games}")
+    return world
+
+
+def run_replay(path, waves=None):
+    # prehra zaznam bez vykreslovania tak rychlo, ako sa da, a overi vysledok;
+    # vlny sa nacitaju zo suboru v hlavicke zaznamu, --waves ho len nahradi inou cestou
+    replay = read_replay(path)
+    world = World(replay.width, replay.height, player_img=load_player_image(),
+                  tick_rate=replay.tick_rate, masks=load_enemy_masks())
+    waves = waves or replay.waves_path
+    if waves and not replay.waves_path:
+        print(f"Zaznam sa hral bez vln, {waves} k nemu nepatri")
+        return False
+    if waves:
+        try:
+            schedule = load_waves(waves, replay.width, replay.height, ENEMY_KINDS)
+        except (OSError, ValueError) as e:
+            print(f"Zaznam sa hral s vlnami {replay.waves_path}, tie sa nepodarilo nacitat: {e}")
+            print("Subor s vlnami sa da zadat cez --waves")
+            return False
+        if schedule.digest != replay.waves_digest:
+            print(f"Vlny v {waves} nie su tie, s ktorymi sa zaznam hral ({replay.waves_path}),"
+                  " subor sa odvtedy zmenil")
+            return False
+        world.set_waves(schedule)
+    world.reset_game(replay.game_mode, seed=replay.seed)
+
+    start = time.perf_counter()
+    for flags, x, y in replay.records:
+        world.apply_input(flags, x, y)
+        world.tick_game()
+    elapsed = time.perf_counter() - start
+
+    ticks = len(replay.records)
+    game_time = ticks / replay.tick_rate
+    print(f"{ticks} tickov ({game_time:.1f} s hry) za {elapsed:.2f} s, "
+          f"{game_time / elapsed if elapsed else float('inf'):.0f}x rychlejsie ako realny cas")
+    print(f"skore {world.score}, level {world.level}, zivoty {world.lives}")
+
+    if replay.footer is None:
+        print("Zaznam nebol ukonceny, vysledok sa neda overit")
+        return None
+    result = (ticks, world.score, world.level, world.lives, world.state_digest())
+    if result == tuple(replay.footer):
+        print("Prehratie sa zhoduje so zaznamom")
+        return True
+    print("NEZHODA so zaznamom:", replay.footer, "!=", result)
+    return False
+
+
+class Program:
+    # bez tychto obrazkov sa hra nespusti, menu pozadie moze dobiehat
+    gameplay_assets = {"playfield_bg", "player", "enemy", "enemy_effect", "laser", "heart", "shield"}
+
+    # parametre castic pre udalosti sveta
+    effects = {
+        "enemy_death": dict(count=40, palette=("#ffffff", "#ffee88", "#ffcc33", "#ff8800",
+                                               "#cc3300", "#551100")),
+        "shield_pop": dict(count=30, palette=("#ffffff", "#aaffff", "#00ffff", "#0088aa"),
+                           speed=(2.0, 7.0), life=(8, 18)),
+        "player_hit": dict(count=60, palette=("#ffffff", "#ffaaaa", "#ff4444", "#aa0000",
+                                              "#440000"), speed=(1.5, 8.0), life=(12, 30)),
+    }
+
+    def __init__(self, tick_rate=BASE_TICK_RATE, max_fps=120, max_catchup_ticks=5,
+                 perf_overlay=False, perf_csv=None, record_dir=None, quality=None,
+                 frame_budget=25.0, waves=None):
         self.root = tkinter.Tk()
         self.root.title("SPACE SHOOTER")
         self.root.attributes("-fullscreen", True)
@@ -415,10 +2314,6 @@ class Program:
                                      bg="black")
         self.canvas.pack()
 
-        self.crosshair_x = self.width//2
-        self.crosshair_y = self.height//2
-        self.crosshair_active = True
-
         self.menu_button = (
             self.width // 2 - 150,
             self.height // 2 - 50,
@@ -473,60 +2368,16 @@ class Program:
 
 
         self.line_y = self.height // 4
-        img = Image.open("game_bg_space_1280x720.png").convert("RGBA")
-        img = img.resize((self.width, self.height - self.line_y), Image.LANCZOS)
-        self.playfield_bg = ImageTk.PhotoImage(img)
-
-        player_base_img = Image.open("pngwing.com.png").convert("RGBA")
-        player_base_img = player_base_img.resize((60, 60), Image.LANCZOS)
-        self.player = Player(self.canvas, self.width // 2, self.height - 50, base_img=player_base_img)
-
-        img_e = Image.open("pngwing2.png").convert("RGBA")
-        img_e = img_e.resize((60, 60), Image.LANCZOS)
-        self.enemy_image_normal = ImageTk.PhotoImage(img_e)
-
-        overlay = Image.new("RGBA", img_e.size, (255, 140, 0, 160))
-        tinted = Image.alpha_composite(img_e, overlay)
-        self.enemy_image_hit = ImageTk.PhotoImage(tinted)
-
-        overlay_chaser = Image.new("RGBA", img_e.size, (120, 255, 120, 160))
-        alpha_mask = img_e.split()[3]
-        overlay_chaser.putalpha(alpha_mask)
-        chaser_tinted = Image.alpha_composite(img_e, overlay_chaser)
-        self.enemy_image_chaser = ImageTk.PhotoImage(chaser_tinted)
-
-        gif = Image.open("fire-17010_256.gif")
+        self.rotation_buckets = 72
+        self.playfield_bg = None
         self.enemy_effect_frames = []
-        for frame in ImageSequence.Iterator(gif):
-            frame = frame.convert("RGBA")
-            frame = frame.resize((120, 85), Image.LANCZOS)
-            self.enemy_effect_frames.append(ImageTk.PhotoImage(frame))
-
-        laser_gif = Image.open("giphy.gif")
-
         self.laser_frames_pil = []
-        for frame in ImageSequence.Iterator(laser_gif):
-            frame = frame.convert("RGBA")
-            frame = frame.resize((60, 120), Image.LANCZOS)
-            tk_frame = ImageTk.PhotoImage(frame)
-            self.laser_frames_pil.append(frame)
-
-        self.max_lives = 3
-        self.lives = self.max_lives
-        img_heart = Image.open("heartpng.png").convert("RGBA")
-        img_heart = img_heart.resize((30, 30), Image.LANCZOS)
-        self.heart_image = ImageTk.PhotoImage(img_heart)
-
-        shield_img = Image.open("shield.png").convert("RGBA")
-        shield_img = shield_img.resize((50, 50), Image.LANCZOS)
-        self.shield_image = ImageTk.PhotoImage(shield_img)
-
-        im = Image.open("menu_bg_animated_1280x720.gif")
-        self.menu_bg_frames = []
-        for frame in ImageSequence.Iterator(im):
-            frame = frame.convert("RGBA")
-            frame = frame.resize((self.width, self.height), Image.LANCZOS)
-            self.menu_bg_frames.append(ImageTk.PhotoImage(frame))
+        self.laser_atlas = None
+        self.heart_image = None
+        self.shield_image = None
+        self.menu_bg = MenuFrameSource(
+            "menu_bg_animated_1280x720.gif", (self.width, self.height), MENU_BG_BYTES
+        )
         self.menu_bg_index = 0
 
         self.stars = []
@@ -535,120 +2386,250 @@ class Program:
             y = random.randint(0, self.height)
             size = random.randint(10, 20)
             self.stars.append((x, y, size))
-        self.enemies = []
-        self.projectiles = []
-        self.player_bullets = []
-        self.shields = []
-        self.has_shield = False
-        self.shield_spawn_timer = 400
+        # obrazky sa do sveta doplnia postupne, ako ich dotiahne nacitavanie
+        self.world = World(
+            self.width,
+            self.height,
+            images={},
+            rotation_buckets=self.rotation_buckets,
+            tick_rate=tick_rate
+        )
+        self.world.on_game_over = self.end_game
+        self.world.on_effect = self.spawn_effect
+        if waves:
+            try:
+                self.world.set_waves(load_waves(waves, self.width, self.height, ENEMY_KINDS))
+            except (OSError, ValueError) as e:
+                print("Vlny sa nepodarilo nacitat, nepriatelia sa losuju podla levelu:", e)
+        self.particles = ParticleSystem()
+        # kvalita sa znizuje, ked snimky nestihaju rozpocet; --quality ju pevne nastavi
+        self.quality = QualityGovernor(budget_ms=frame_budget, pinned=quality)
+        self.plain_text = False
+        self.rebuild_scene = False
 
-        self.invincible = False
         self.pause_exit_button = None
-        self.blink_count = 0
-        self.score = 0
-        self.best_score = 0
-        self.level = 1
-        self.state = "menu"
+        self.state = "loading"
+        self.tick_rate = tick_rate
+        self.input_keys = 0
+        self.fire_requested = False
+        self.record_dir = record_dir
+        self.recorder = None
         self.game_mode = "hardcore"
         self.running = False
-        self.game_over = False
-        self.spawn_timer = 0
-        self.max_fire_cooldown = 20
-        self.fire_cooldown = 0
-        self.score_file = "scores.json"
+        self.tick_dt = 1.0 / tick_rate
+        self.frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.max_catchup_ticks = max_catchup_ticks
+        self.accumulator = 0.0
+        self.menu_anim_timer = 0.0
+        self.last_frame = time.perf_counter()
+        self.next_frame = self.last_frame
+        self.rate_start = self.last_frame
+        self.rate_ticks = 0
+        self.rate_frames = 0
+        self.measured_tps = 0.0
+        self.measured_fps = 0.0
+        self.hud_updates = 0
+        self.measured_hud_ups = 0.0
+        self.rate_photos = photo_stats["created"]
+        self.measured_photos = 0.0
+
+        # meranie bezi stale, prehlad (F3) a CSV ho len zobrazuju
+        self.perf = PerfStats()
+        self.perf_overlay = perf_overlay
+        self.perf_next_refresh = 0.0
+        self.perf_csv_file = None
+        self.perf_csv = None
+        if perf_csv:
+            self.perf_csv_file = open(perf_csv, "w", newline="", encoding="utf-8")
+            self.perf_csv = csv.writer(self.perf_csv_file)
+            self.perf_csv.writerow(self.perf_columns())
+
+        self.scene = None
+        self.drawn = set()
+        self.item_shown = {}
+        self.hud_values = {}
+        self.outlined_pos = {}
+        self.outlined_text = {}
+        self.text_images = {}
+        try:
+            self.text_atlas = TextAtlas(load_font_data(), self.root.winfo_fpixels("1p"))
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            print("Pismo sa nepodarilo nacitat, text sa kresli cez Tk:", e)
+            self.text_atlas = None
         self.description_file = "info.txt"
         self.description_lines = []
         self.load_description_text()
         self.load_scores()
+        self.apply_quality()
         self.root.bind("<KeyPress>", self.on_key_press)
         self.root.bind("<KeyRelease>", self.on_key_release)
         self.canvas.bind("<Button-1>", self.on_click)
         self.canvas.bind("<Motion>", self.on_mouse_move)
+        self.load_error = None
+        self.start_loading()
         self.game_loop()
         self.root.mainloop()
+        if self.loader is not None:
+            self.loader.close()
+        self.menu_bg.close()
+        self.stop_recording()
+        if self.scores is not None:
+            self.scores.close()
+        if self.perf_csv_file is not None:
+            self.perf_csv_file.close()
+        self.report_atlas()
+        if self.load_error is not None:
+            raise SystemExit(1)
+
+    def start_loading(self):
+        # menu pozadie ide prve, aby sa menu ukazalo co najskor
+        self.load_start = time.perf_counter()
+        self.first_frame_time = None
+        self.loaded_assets = set()
+        self.gameplay_ready = False
+        self.loader = AssetLoader()
+        self.loader.submit_frames("menu_bg", self.menu_bg.path, self.menu_bg.size)
+        self.loader.submit("playfield_bg", load_image, "game_bg_space_1280x720.png",
+                           (self.width, self.height - self.line_y))
+        self.loader.submit("player", load_player_rotations, "pngwing.com.png", self.rotation_buckets)
+        self.loader.submit("enemy", load_enemy_images, "pngwing2.png", self.world.enemy_size)
+        self.loader.submit("enemy_effect", load_frames, "fire-17010_256.gif", (120, 85))
+        self.loader.submit("laser", load_frames, "giphy.gif", (60, 120))
+        self.loader.submit("heart", load_image, "heartpng.png", (30, 30))
+        self.loader.submit("shield", load_image, "shield.png", self.world.shield_size)
+
+    def poll_assets(self):
+        if self.loader is None:
+            return
+        # PhotoImage sa smie robit len v hlavnom vlakne, preto po kusoch v kazdom frame
+        for kind, name, value in self.loader.poll(budget=0.008):
+            if kind == "error":
+                # vynimka z after callbacku by len zastavila slucku a okno by ostalo na
+                # NACITAVAM, preto sa chyba vypise a okno sa zavrie
+                print(f"Obrazok {name} sa nepodarilo nacitat:", file=sys.stderr)
+                traceback.print_exception(type(value), value, value.__traceback__)
+                self.load_error = value
+                self.root.destroy()
+                return
+            if kind == "frame":
+                self.menu_bg.put(*value)
+            else:
+                self.asset_loaded(name, value)
+            if self.state == "loading" and len(self.menu_bg):
+                self.state = "menu"
+
+        if self.loader.done:
+            self.loader.close()
+            self.loader = None
+            print(f"Vsetky obrazky nacitane za {(time.perf_counter() - self.load_start) * 1000:.0f} ms")
+
+    def asset_loaded(self, name, value):
+        images = self.world.images
+        if name == "menu_bg":
+            self.menu_bg.attach(value)
+            if self.scene not in ("menu", "about"):
+                self.menu_bg.release()
+        elif name == "playfield_bg":
+            self.playfield_bg = make_photo(value)
+        elif name == "player":
+            self.world.player.set_rotations(value)
+            value.prebuild()
+        elif name == "enemy":
+            img_e, tinted, chaser_tinted = value
+            images["enemy_normal"] = make_photo(img_e)
+            images["enemy_hit"] = make_photo(tinted)
+            images["enemy_chaser"] = make_photo(chaser_tinted)
+            self.world.set_masks(enemy_masks(img_e, tinted, chaser_tinted))
+        elif name == "enemy_effect":
+            self.enemy_effect_frames = [make_photo(frame) for frame in value]
+            images["enemy_effect"] = self.enemy_effect_frames
+        elif name == "laser":
+            self.laser_frames_pil = value
+            self.laser_atlas = RotationCache(
+                self.laser_frames_pil,
+                buckets=self.rotation_buckets,
+                max_bytes=32 * 1024 * 1024
+            )
+            images["laser_atlas"] = self.laser_atlas
+        elif name == "heart":
+            self.heart_image = make_photo(value)
+        elif name == "shield":
+            self.shield_image = make_photo(value)
+            images["shield"] = self.shield_image
+
+        self.loaded_assets.add(name)
+        if not self.gameplay_ready and self.loaded_assets >= self.gameplay_assets:
+            self.gameplay_ready = True
+            # atlasy hraca a strely uz existuju, dostanu aktualnu uroven
+            self.apply_quality()
+
+    def report_atlas(self):
+        if self.laser_atlas is None:
+            return
+        st = self.laser_atlas.stats()
+        print(
+            f"laser atlas: {st['entries']} snimkov, "
+            f"{st['bytes'] / 1048576:.1f}/{st['max_bytes'] / 1048576:.1f} MB, "
+            f"uspesnost {st['hit_rate'] * 100:.1f} %, vyhodenych {st['evictions']}"
+        )
 
     def start_game(self):
         self.state = "game"
-        self.running = True
-        self.game_over = False
         self.reset_game()
 
     def on_mouse_move(self, event):
         if self.state != "game":
-            self.crosshair_active = False
+            self.world.crosshair_active = False
             self.canvas.config(cursor="arrow")
             return
 
-        if not self.running or self.game_over:
-            self.crosshair_active = False
+        if not self.running or self.world.game_over:
+            self.world.crosshair_active = False
             self.canvas.config(cursor="arrow")
             return
 
         line_y = self.height // 4
 
         if event.y < line_y:
-            self.crosshair_active = False
+            self.world.crosshair_active = False
             self.canvas.config(cursor="arrow")
         else:
-            self.crosshair_active = True
+            self.world.crosshair_active = True
             self.canvas.config(cursor="none")
-            self.crosshair_x = event.x
-            self.crosshair_y = event.y
+            self.world.crosshair_x = event.x
+            self.world.crosshair_y = event.y
 
     def on_key_press(self, event):
+        # klavesy sa len zapamataju, do sveta sa dostanu az na zaciatku ticku
         if event.keysym in ("Left", "a", "A"):
-            self.player.vx = -self.player.speed
+            self.input_keys = self.input_keys & ~KEY_RIGHT | KEY_LEFT
         elif event.keysym in ("Right", "d", "D"):
-            self.player.vx = self.player.speed
+            self.input_keys = self.input_keys & ~KEY_LEFT | KEY_RIGHT
         elif event.keysym in ("Up", "w", "W"):
-            self.player.vy = -self.player.speed
+            self.input_keys = self.input_keys & ~KEY_DOWN | KEY_UP
         elif event.keysym in ("Down", "s", "S"):
-            self.player.vy = self.player.speed
+            self.input_keys = self.input_keys & ~KEY_UP | KEY_DOWN
+        elif event.keysym == "F3":
+            self.perf_overlay = not self.perf_overlay
+            if self.perf_overlay:
+                self.build_perf_overlay()
+            else:
+                self.canvas.delete("perf")
         elif event.keysym == "space":
-            if not self.game_over:
+            if not self.world.game_over:
                 self.running = not self.running
 
                 if not self.running:
-                    self.crosshair_active = False
+                    self.world.crosshair_active = False
                     self.canvas.config(cursor="arrow")
                 else:
                     pass
 
     def on_key_release(self, event):
         if event.keysym in ("Left", "a", "A", "Right", "d", "D"):
-            self.player.vx = 0
+            self.input_keys &= ~(KEY_LEFT | KEY_RIGHT)
         if event.keysym in ("Up", "w", "W", "Down", "s", "S"):
-            self.player.vy = 0
-
-    def fire_bullet(self):
-        if not self.crosshair_active:
-            return
-
-        if self.fire_cooldown>0:
-            return
-        dx = self.crosshair_x - self.player.x
-        dy = self.crosshair_y - self.player.y
-
-        if dx == 0 and dy == 0:
-            return
-        speed = 20
-
-        length = (dx ** 2 + dy ** 2) ** 0.5
-        vx = dx / length * speed
-        vy = dy / length * speed
-
-        bullet = PlayerBullet(
-            self.canvas,
-            self.player.x,
-            self.player.y,
-            vx,
-            vy,
-            color="cyan",
-            frames_pil=self.laser_frames_pil
-        )
-        self.player_bullets.append(bullet)
-
-        self.fire_cooldown = self.max_fire_cooldown
+            self.input_keys &= ~(KEY_UP | KEY_DOWN)
 
     def on_click(self, event):
         x, y = event.x, event.y
@@ -656,7 +2637,8 @@ class Program:
         if self.state == "menu":
             x1, y1, x2, y2 = self.menu_button
             if x1 <= x <= x2 and y1 <= y <= y2:
-                self.start_game()
+                if self.gameplay_ready:
+                    self.start_game()
                 return
 
             cx1, cy1, cx2, cy2 = self.mode_button_classic
@@ -671,8 +2653,8 @@ class Program:
 
             rx1, ry1, rx2, ry2 = self.reset_score_button
             if rx1 <= x <= rx2 and ry1 <= y <= ry2:
-                self.best_score = 0
-                self.save_scores()
+                if self.scores is not None:
+                    self.scores.reset()
                 return
 
             ix1, iy1, ix2, iy2 = self.info_button
@@ -682,25 +2664,24 @@ class Program:
 
             return
 
-        if self.game_over:
+        if self.world.game_over:
             self.reset_game()
             self.state = "game"
-            self.running = True
             return
 
-        if self.state == "game" and not self.running and not self.game_over:
+        if self.state == "game" and not self.running and not self.world.game_over:
             if self.pause_exit_button is not None:
                 x1, y1, x2, y2 = self.pause_exit_button
                 if x1 <= x <= x2 and y1 <= y <= y2:
-                    self.reset_game()
+                    self.stop_recording()
+                    self.world.reset_game(self.game_mode)
                     self.running = False
-                    self.game_over = False
                     self.state = "menu"
                     return
             return
 
         if self.state == "game" and self.running:
-            self.fire_bullet()
+            self.fire_requested = True
 
         if self.state == "about":
             if hasattr(self, "about_back_button") and self.about_back_button is not None:
@@ -715,347 +2696,382 @@ class Program:
             try:
                 with open(self.description_file, "r", encoding="utf-8") as f:
                     text = f.read()
-                self.description_lines = text.splitlines()
-            except Exception as e:
-                print("Chyba pri čítaní description.txt:", e)
-                self.description_lines = ["Chyba pri nacitani popisu hry."]
-        else:
-            self.description_lines = [
-                "SPACE SHOOTER",
-                "",
-                "Subor description.txt nebol najdeny.",
-                "Vytvor ho v rovnakom priecinku ako hra."
-            ]
-
-    def load_scores(self):
-        if os.path.exists(self.score_file):
-            try:
-                with open(self.score_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.best_score = data.get("best_score", 0)
-            except Exception:
-                self.best_score = 0
-
-    def save_scores(self):
-        data = {"best_score": self.best_score}
-        with open(self.score_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-    def reset_game(self):
-        self.enemies = []
-        self.projectiles = []
-        self.player_bullets = []
-        self.shields = []
-        self.has_shield = False
-        self.shield_spawn_timer = 100
-
-        self.score = 0
-        self.level = 1
-        self.player.x = self.width // 2
-        self.player.vx = 0
-        self.lives = self.max_lives
-        self.running = True
-        self.game_over = False
-        self.invincible = False
-        self.blink_count = 0
-        self.player.visible = True
-        self.fire_cooldown = 0
-        if self.game_mode == "hardcore":
-            self.lives = 1
-        else:
-            self.lives = self.max_lives
-
-    def spawn_enemy(self):
-        line_y = self.height // 4
-
-        if random.random() < 0.2:
-            side = random.choice(["left", "right"])
-            y = random.randint(line_y + 50, self.height - 50)
-            vy = 0
-            speed = random.randint(3, 6)
-            if side == "left":
-                x = -40
-                vx = speed
-            else:
-                x = self.width + 40
-                vx = -speed
-        else:
-            x = random.randint(30, self.width - 30)
-            y = -20
-            vy = random.randint(2, 3 + self.level)
-            vx = 0
-
-        shoot_chance = min(0.5 + self.level * 0.05, 0.8)
-        can_shoot = random.random() < shoot_chance
-
-        if self.level <= 2:
-            kind = "basic"
-        else:
-            kinds = ["basic", "zigzag", "chaser"]
-            if self.level < 5:
-                weights = [0.4, 0.35, 0.25]
-            else:
-                weights = [0.25, 0.4, 0.35]
-            kind = random.choices(kinds, weights=weights)[0]
-
-        image_normal = self.enemy_image_normal
-        image_hit = self.enemy_image_hit
-        projectile_color = "lightblue"
-        projectile_speed_mult = 1.0
-
-        if kind == "zigzag":
-            projectile_color = "#ff66ff"
-            projectile_speed_mult = 0.6
-
-        elif kind == "chaser":
-            can_shoot = False
-            image_normal = self.enemy_image_chaser
-            projectile_color = "#ff4444"
-            projectile_speed_mult = 1.0
-
-        enemy = Enemy(
-            self.canvas,
-            x, y, vy,
-            can_shoot=can_shoot,
-            image_normal=image_normal,
-            image_hit=image_hit,
-            vx=vx,
-            effect_frames=self.enemy_effect_frames,
-            kind=kind,
-            projectile_color=projectile_color,
-            projectile_speed_mult=projectile_speed_mult
-        )
-        self.enemies.append(enemy)
-
-    def spawn_shield(self):
-        line_y = self.height // 4
+                self.description_lines = text.splitlines()
+            except Exception as e:
+                print("Chyba pri čítaní description.txt:", e)
+                self.description_lines = ["Chyba pri nacitani popisu hry."]
+        else:
+            self.description_lines = [
+                "SPACE SHOOTER",
+                "",
+                "Subor description.txt nebol najdeny.",
+                "Vytvor ho v rovnakom priecinku ako hra."
+            ]
 
-        x = random.randint(50, self.width - 50)
-        y = random.randint(line_y + 50, self.height - 80)
+    def load_scores(self):
+        # scores.json z predoslych verzii sa pri prvom starte prenesie do databazy
+        try:
+            self.scores = Leaderboard("scores.db", legacy_json="scores.json")
+        except sqlite3.Error as e:
+            print("Databaza vysledkov sa neda otvorit, vysledky sa neulozia:", e)
+            self.scores = None
 
-        shield = Shield(self.canvas, x, y,image= self.shield_image,)
-        self.shields.append(shield)
+    @property
+    def best_score(self):
+        # najlepsie skore zvoleneho modu, drzi sa v pamati
+        if self.scores is None:
+            return 0
+        return self.scores.best(self.game_mode)
 
-    def spawn_projectile(self, x, y, vx,vy, color = "lightblue"):
-        proj = Projectile(self.canvas, x, y, vx=vx, vy=vy, color=color)
-        self.projectiles.append(proj)
 
-    def check_collision(self, bbox1, bbox2):
-        x1a, y1a, x1b, y1b = bbox1
-        x2a, y2a, x2b, y2b = bbox2
-        return not (x1b < x2a or x1a > x2b or y1b < y2a or y1a > y2b)
+    def reset_game(self):
+        self.stop_recording()
+        self.world.reset_game(self.game_mode)
+        self.particles.clear()
+        self.input_keys = 0
+        self.fire_requested = False
+        self.running = True
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d_%H%M%S')}_{self.game_mode}_{self.world.seed}.ssr"
+            waves = self.world.waves
+            self.recorder = ReplayWriter(os.path.join(self.record_dir, name), self.world.seed,
+                                         self.tick_rate, self.width, self.height, self.game_mode,
+                                         waves_path=waves.path if waves else "",
+                                         waves_digest=waves.digest if waves else 0)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            world = self.world
+            self.recorder.close(world.score, world.level, world.lives, world.state_digest())
+            print("Zaznam hry ulozeny:", self.recorder.path)
+            self.recorder = None
+
+    def game_input(self):
+        flags = self.input_keys
+        if self.world.crosshair_active:
+            flags |= CROSSHAIR
+        if self.fire_requested:
+            flags |= FIRE
+            self.fire_requested = False
+        return flags, clamp16(self.world.crosshair_x), clamp16(self.world.crosshair_y)
 
     def game_loop(self):
-        self.canvas.delete("all")
+        now = time.perf_counter()
+        real_frame_time = now - self.last_frame
+        frame_time = min(real_frame_time, 0.25)
+        self.last_frame = now
+        self.accumulator += frame_time
+
+        self.poll_assets()
+        if self.load_error is not None:
+            return
+        if self.state != self.scene or self.rebuild_scene:
+            self.rebuild_scene = False
+            self.enter_scene(self.state)
+
+        t_tick = time.perf_counter()
+        draw_time = 0.0
+        hud_time = 0.0
+        ticks = 0
+        while self.accumulator >= self.tick_dt:
+            if ticks >= self.max_catchup_ticks:
+                # po zaseknuti sa nedobieha vsetko, inak by kazdy dalsi frame trval dlhsie
+                self.accumulator = 0.0
+                break
+            self.fixed_tick()
+            self.accumulator -= self.tick_dt
+            ticks += 1
+        tick_time = time.perf_counter() - t_tick
 
         if self.state == "menu":
-            if self.menu_bg_frames:
-                self.menu_bg_index = (self.menu_bg_index + 1) % len(self.menu_bg_frames)
             self.draw_menu()
 
         elif self.state == "about":
             self.draw_about()
 
+        elif self.state == "loading":
+            pass
+
         else:
-            if self.running and not self.game_over:
-                self.tick_game()
+            if self.running and not self.world.game_over:
+                alpha = self.accumulator / self.tick_dt
+            else:
+                alpha = 1.0
 
             self.draw_bg()
-            self.draw_all()
+            t_draw = time.perf_counter()
+            self.draw_all(alpha)
+            t_hud = time.perf_counter()
             self.draw_hud()
+            draw_time = t_hud - t_draw
+            hud_time = time.perf_counter() - t_hud
+
+        # prekreslenie canvasu by Tk aj tak spravil hned po tomto frame, takto sa da odmerat
+        t_idle = time.perf_counter()
+        self.root.update_idletasks()
+        idle_time = time.perf_counter() - t_idle
+        self.perf.record((tick_time, draw_time, hud_time, idle_time, real_frame_time))
+
+        self.measure_rates(now, ticks)
+        if self.perf_overlay and now >= self.perf_next_refresh:
+            self.perf_next_refresh = now + 0.25
+            self.draw_perf_overlay()
+        if self.state != "loading" and self.quality.record(time.perf_counter() - now):
+            print(f"Kvalita {self.quality.level}: {self.quality.name()}")
+            self.apply_quality()
+        self.schedule_frame()
+
+    def apply_quality(self):
+        level = self.quality.level
+        self.world.enemies.show_effects = level < 1
+        coarse = 3 if level >= 2 else 1
+        if self.world.player.rotations is not None:
+            self.world.player.rotations.coarse = coarse
+        if self.laser_atlas is not None:
+            self.laser_atlas.coarse = coarse
+        if self.plain_text != (level >= 3):
+            # texty sa vytvaraju pri vstupe do sceny, zmena sa prejavi jej novym postavenim
+            self.plain_text = level >= 3
+            self.rebuild_scene = True
+        self.menu_bg.quality_step = 2 if level >= 4 else 1
+
+    def fixed_tick(self):
+        if self.state == "menu":
+            # pri nizsej kvalite alebo vo velkom rozliseni sa snimky GIFu preskakuju,
+            # animacia ide rovnako rychlo
+            step = self.menu_bg.step
+            self.menu_anim_timer += self.world.dt
+            if self.menu_anim_timer >= step and len(self.menu_bg):
+                self.menu_anim_timer -= step
+                self.menu_bg_index = self.menu_bg.next_index(self.menu_bg_index)
+
+        elif self.state == "game":
+            if self.running and not self.world.game_over:
+                flags, x, y = self.game_input()
+                if self.recorder is not None:
+                    self.recorder.write(flags, x, y)
+                self.world.apply_input(flags, x, y)
+                self.world.tick_game()
+                self.particles.update(self.world.dt)
+
+    def schedule_frame(self):
+        # dalsi frame sa planuje od pevneho casu, nie od konca tohto, aby sa chyba nesctitavala
+        self.next_frame += self.frame_interval
+        delay = self.next_frame - time.perf_counter()
+        if delay < -self.frame_interval:
+            self.next_frame = time.perf_counter()
+            delay = 0
+        self.root.after(max(1, int(delay * 1000)), self.game_loop)
+
+    def measure_rates(self, now, ticks):
+        self.rate_ticks += ticks
+        self.rate_frames += 1
+        elapsed = now - self.rate_start
+        if elapsed >= 1.0:
+            self.measured_tps = self.rate_ticks / elapsed
+            self.measured_fps = self.rate_frames / elapsed
+            self.measured_hud_ups = self.hud_updates / elapsed
+            self.hud_updates = 0
+            self.measured_photos = (photo_stats["created"] - self.rate_photos) / elapsed
+            self.rate_photos = photo_stats["created"]
+            if self.perf_csv is not None:
+                self.write_perf_row()
+            self.rate_ticks = 0
+            self.rate_frames = 0
+            self.rate_start = now
+
+    def perf_counts(self):
+        world = self.world
+        return {
+            "fps": self.measured_fps,
+            "tps": self.measured_tps,
+            "hud_ups": self.measured_hud_ups,
+            "photos_per_s": self.measured_photos,
+            "canvas_items": len(self.canvas.find_all()),
+            "enemies": len(world.enemies),
+            "projectiles": len(world.projectiles),
+            "player_bullets": len(world.player_bullets),
+            "shields": len(world.shields),
+            "particles": len(self.particles),
+            "quality": self.quality.level,
+        }
+
+    def perf_columns(self):
+        columns = ["time", "scene"]
+        for name in PerfStats.phases[:-1]:
+            columns += [name + "_avg", name + "_p95"]
+        columns += ["frame_p50", "frame_p95", "frame_p99"]
+        columns += ["fps", "tps", "hud_ups", "photos_per_s", "canvas_items",
+                    "enemies", "projectiles", "player_bullets", "shields", "particles", "quality"]
+        return columns
+
+    def write_perf_row(self):
+        row = self.perf.summary()
+        row.update(self.perf_counts())
+        row["time"] = time.perf_counter() - self.load_start
+        row["scene"] = self.scene
+        self.perf_csv.writerow(
+            f"{row[c]:.3f}" if isinstance(row.get(c), float) else row.get(c, "")
+            for c in self.perf_columns()
+        )
 
-        self.root.after(25, self.game_loop)
-
-    def tick_game(self):
-        self.level = 1 + self.score // 10
-
-        if self.fire_cooldown > 0:
-            self.fire_cooldown -= 1
-
-        self.player.update(self.width,self.height)
-        dx = self.crosshair_x - self.player.x
-        dy = self.crosshair_y - self.player.y
-        if dx != 0 or dy != 0:
-            self.player.angle = math.degrees(math.atan2(dy, dx))
-
-        if len(self.shields) < 5:
-            self.shield_spawn_timer -= 1
-            if self.shield_spawn_timer <= 0:
-                self.spawn_shield()
-                self.shield_spawn_timer = random.randint(100, 300)
-
-        self.spawn_timer -= 1
-        if self.spawn_timer <= 0:
-            self.spawn_enemy()
-            self.spawn_timer = max(25, 50 - self.level * 5)
-
-        for enemy in self.enemies[:]:
-            enemy.update(
-                self.spawn_projectile,
-                player=self.player,
-                level=self.level
-            )
-
-            if enemy.is_dying:
-                enemy.death_timer -= 1
-                if enemy.death_timer <= 0:
-                    if enemy in self.enemies:
-                        self.enemies.remove(enemy)
-                continue
-
-            if enemy.y > self.height + 40 or enemy.x < -40 or enemy.x > self.width + 40:
-                self.enemies.remove(enemy)
-
-        for proj in self.projectiles[:]:
-            proj.update()
-            if (proj.x < -50 or proj.x > self.width + 50 or
-                    proj.y < -50 or proj.y > self.height + 50):
-                self.projectiles.remove(proj)
-
-        for b in self.player_bullets[:]:
-            b.update()
-            if (b.x < -50 or b.x > self.width + 50 or
-                    b.y < -50 or b.y > self.height + 50):
-                self.player_bullets.remove(b)
-
-        for b in self.player_bullets[:]:
-            bb = b.get_bbox()
-            hit = False
-            for enemy in self.enemies:
-                if enemy.is_dying:
-                    continue
-                if self.check_collision(bb, enemy.get_bbox()):
-                    enemy.start_dying()
-                    hit = True
-                    self.score += 1
-                    break
-            if hit:
-                self.player_bullets.remove(b)
-
-        player_bb = self.player.get_bbox()
-
-        for sh in self.shields[:]:
-            if self.check_collision(player_bb, sh.get_bbox()):
-                if self.has_shield:
-                    continue
-
-                self.has_shield = True
-                self.shields.remove(sh)
-
-        if not self.invincible:
-            for enemy in self.enemies:
-                if enemy.is_dying:
-                    continue
-                if self.check_collision(player_bb, enemy.get_bbox()):
-                    self.hit_player()
-                    return
-
-            for proj in self.projectiles[:]:
-                if self.check_collision(player_bb, proj.get_bbox()):
-                    if self.has_shield:
-                        self.has_shield = False
-                        self.projectiles.remove(proj)
-                    else:
-                        self.hit_player()
-                        return
-
-    def hit_player(self):
-        self.has_shield = False
-        self.lives -= 1
-
-        if self.lives <= 0:
-            self.end_game()
-            return
-
-        self.player.x = self.width // 2
-        self.player.y = self.height - 50
-        self.player.vx = 0
-        self.player.vy = 0
-        self.projectiles = []
-
-        self.invincible = True
-        self.blink_count = 10
-        self.player.visible = True
-        self.blink_player()
-
-    def blink_player(self):
-        self.player.visible = not self.player.visible
-        self.blink_count -= 1
-
-        if self.blink_count > 0:
-            self.root.after(100, self.blink_player)
+    def build_perf_overlay(self):
+        self.canvas.delete("perf")
+        self.perf_bg = self.canvas.create_rectangle(0, 0, 0, 0, fill="black", outline="lime",
+                                                    tags=("perf",))
+        self.perf_text = self.canvas.create_text(12, 12, text="", fill="lime", anchor="nw",
+                                                 font=("Courier", 10), tags=("perf",))
+        self.perf_next_refresh = 0.0
+
+    def draw_perf_overlay(self):
+        stats = self.perf.summary()
+        counts = self.perf_counts()
+        lines = [
+            f"FPS {counts['fps']:6.1f}  TPS {counts['tps']:6.1f}  HUD {counts['hud_ups']:.0f}/s",
+        ]
+        for name in PerfStats.phases[:-1]:
+            lines.append(f"{name:<10} {stats.get(name + '_avg', 0):6.2f} ms"
+                         f"  p95 {stats.get(name + '_p95', 0):6.2f} ms")
+        lines.append(f"frame p50 {stats.get('frame_p50', 0):.1f}  p95 {stats.get('frame_p95', 0):.1f}"
+                     f"  p99 {stats.get('frame_p99', 0):.1f} ms")
+        lines.append(f"polozky canvasu {counts['canvas_items']}  PhotoImage/s {counts['photos_per_s']:.1f}")
+        lines.append(f"enemies {counts['enemies']}  projectiles {counts['projectiles']}"
+                     f"  player_bullets {counts['player_bullets']}  shields {counts['shields']}")
+        lines.append(f"castice {counts['particles']}  neodpalene pre rozpocet {self.particles.dropped}")
+        lines.append(f"kvalita {counts['quality']} ({self.quality.name()})"
+                     f"  priemer {(self.quality.average or 0) * 1000:.1f}/{self.quality.budget * 1000:.0f} ms")
+        self.canvas.itemconfig(self.perf_text, text="\n".join(lines))
+        x1, y1, x2, y2 = self.canvas.bbox(self.perf_text)
+        self.canvas.coords(self.perf_bg, x1 - 6, y1 - 6, x2 + 6, y2 + 6)
+        self.canvas.tag_raise("perf")
+
+    def enter_scene(self, scene):
+        # canvas sa maze len pri zmene obrazovky, inak sa polozky iba posuvaju
+        for obj in self.drawn:
+            obj.undraw(self.canvas)
+        self.drawn = set()
+        self.canvas.delete("all")
+        self.item_shown = {}
+        self.outlined_pos = {}
+        self.outlined_text = {}
+        self.text_images = {}
+        self.hud_values = {}
+        previous = self.scene
+        self.scene = scene
+
+        menu_scenes = ("menu", "about")
+        if previous in menu_scenes and scene == "game":
+            before = resident_memory()
+            self.menu_bg.release()
+            self.report_memory("odchod z menu", before, resident_memory())
+        elif previous == "game" and scene in menu_scenes:
+            before = resident_memory()
+            self.menu_bg.get(self.menu_bg_index)
+            self.report_memory("navrat do menu", before, resident_memory())
+
+        if scene == "menu":
+            self.build_menu()
+        elif scene == "loading":
+            self.build_loading()
+        elif scene == "about":
+            self.build_about()
         else:
-            self.player.visible = True
-            self.invincible = False
+            self.build_game_scene()
 
-    def flash_enemy_death(self, x, y, steps=6, delay=50):
-        size = 20
+        if self.perf_overlay:
+            self.build_perf_overlay()
 
-        def step(i):
-            if i >= steps:
-                return
+    def report_memory(self, label, before, after):
+        if before is None or after is None:
+            return
+        print(f"Pamat ({label}): {before / 1048576:.1f} MB -> {after / 1048576:.1f} MB")
 
-            color = "yellow" if i % 2 == 0 else "orange"
-            oid = self.canvas.create_oval(
-                x - size, y - size,
-                x + size, y + size,
-                fill=color,
-                outline=""
-            )
-            self.root.after(
-                delay,
-                lambda oid=oid, i=i: (self.canvas.delete(oid), step(i + 1))
-            )
-        step(0)
+    def show(self, item, visible):
+        if self.item_shown.get(item) != visible:
+            self.canvas.itemconfig(item, state="normal" if visible else "hidden")
+            self.item_shown[item] = visible
 
+    def spawn_effect(self, name, x, y):
+        self.particles.burst(x, y, **self.effects[name])
 
     def end_game(self):
-        self.game_over = True
         self.running = False
-        if self.score > self.best_score:
-            self.best_score = self.score
-            self.save_scores()
+        self.stop_recording()
+        world = self.world
+        if self.scores is not None:
+            self.scores.record(world.game_mode, world.score, world.level,
+                               world.timers.now / world.tick_rate)
 
-    def draw_all(self):
+    def build_game_scene(self):
         line_y = self.height//4
         self.canvas.create_image(
             0, line_y,
             image=self.playfield_bg,
             anchor="nw"
         )
-        for sh in self.shields:
-            sh.draw()
+        # neviditelne znacky vrstiev, nove polozky entit sa vkladaju pod ne
+        for layer in ("shields", "player"):
+            self.canvas.create_line(0, 0, 0, 0, state="hidden", tags=("layer:" + layer,))
+
+        self.shield_ring = self.canvas.create_oval(
+            0, 0, 0, 0,
+            outline="cyan",
+            width=3,
+            state="hidden"
+        )
+        self.item_shown[self.shield_ring] = False
 
-        self.player.draw()
+        for layer in ("enemies", "particles", "projectiles", "bullets"):
+            self.canvas.create_line(0, 0, 0, 0, state="hidden", tags=("layer:" + layer,))
 
-        if self.has_shield:
-            r = max(self.player.width, self.player.height) // 2 + 10
+        self.build_hud()
 
-            self.canvas.create_oval(
-                self.player.x - r,
-                self.player.y - r,
-                self.player.x + r,
-                self.player.y + r,
-                outline="cyan",
-                width=3
+    def draw_all(self, alpha=1.0):
+        live = set()
+        for sh in self.world.shields:
+            sh.draw(self.canvas)
+            live.add(sh)
+
+        self.world.player.draw(self.canvas, alpha)
+        live.add(self.world.player)
+
+        if self.world.has_shield:
+            r = max(self.world.player.width, self.world.player.height) // 2 + 10
+
+            self.canvas.coords(
+                self.shield_ring,
+                self.world.player.draw_x - r,
+                self.world.player.draw_y - r,
+                self.world.player.draw_x + r,
+                self.world.player.draw_y + r
             )
+        self.show(self.shield_ring, self.world.has_shield)
+
+        self.world.enemies.draw(self.canvas, alpha)
+        live.add(self.world.enemies)
 
-        for enemy in self.enemies:
-            enemy.draw()
+        self.particles.draw(self.canvas, alpha)
+        live.add(self.particles)
 
-        for proj in self.projectiles:
-            proj.draw()
+        self.world.projectiles.draw(self.canvas, alpha)
+        live.add(self.world.projectiles)
 
-        for b in self.player_bullets:
-            b.draw()
+        for b in self.world.player_bullets:
+            b.draw(self.canvas, alpha)
+            live.add(b)
+
+        # entity, ktore zo zoznamov zmizli, zmazu svoje polozky z canvasu
+        for obj in self.drawn - live:
+            obj.undraw(self.canvas)
+        self.drawn = live
 
     def draw_bg(self):
         ...
 
-    def draw_menu(self):
-        frame = self.menu_bg_frames[self.menu_bg_index]
-        self.canvas.create_image(0, 0, image=frame, anchor="nw")
+    def build_menu(self):
+        self.menu_bg_item = self.canvas.create_image(0, 0, anchor="nw")
+        self.menu_bg_shown = None
         try:
             self.canvas.create_text(
                 self.width // 2,
@@ -1068,13 +3084,13 @@ class Program:
         except:
             pass
         x1, y1, x2, y2 = self.menu_button
-        self.canvas.create_rectangle(
+        self.start_rect = self.canvas.create_rectangle(
             x1, y1, x2, y2,
             fill="#aa0000",
             outline="yellow",
             width=3
         )
-        self.canvas.create_text(
+        self.start_text = self.canvas.create_text(
             (x1 + x2) // 2,
             (y1 + y2) // 2,
             text="START",
@@ -1082,25 +3098,13 @@ class Program:
             font=("Press Start 2P", 30),
             anchor="center"
         )
+        self.menu_start_ready = None
 
         cx1, cy1, cx2, cy2 = self.mode_button_classic
         hx1, hy1, hx2, hy2 = self.mode_button_hardcore
 
-        if self.game_mode == "classic":
-            classic_fill = "#00aa00"
-            classic_outline = "white"
-            hardcore_fill = "#333333"
-            hardcore_outline = "gray"
-        else:
-            classic_fill = "#333333"
-            classic_outline = "gray"
-            hardcore_fill = "#aa5500"
-            hardcore_outline = "white"
-
-        self.canvas.create_rectangle(
+        self.classic_rect = self.canvas.create_rectangle(
             cx1, cy1, cx2, cy2,
-            fill=classic_fill,
-            outline=classic_outline,
             width=3
         )
         self.canvas.create_text(
@@ -1111,10 +3115,8 @@ class Program:
             font=("Press Start 2P", 12)
         )
 
-        self.canvas.create_rectangle(
+        self.hardcore_rect = self.canvas.create_rectangle(
             hx1, hy1, hx2, hy2,
-            fill=hardcore_fill,
-            outline=hardcore_outline,
             width=3
         )
         self.canvas.create_text(
@@ -1127,7 +3129,7 @@ class Program:
 
         rx1, ry1, rx2, ry2 = self.reset_score_button
 
-        self.canvas.create_text(
+        self.menu_best_text = self.canvas.create_text(
             self.width // 2,
             ry1 - 25,
             text=f"NAJLEPSIE SKORE: {self.best_score}",
@@ -1167,9 +3169,58 @@ class Program:
             anchor="center"
         )
 
-    def draw_about(self):
-        frame = self.menu_bg_frames[self.menu_bg_index]
-        self.canvas.create_image(0, 0, image=frame, anchor="nw")
+    def build_loading(self):
+        self.canvas.create_text(
+            self.width // 2,
+            self.height // 2,
+            text="NACITAVAM...",
+            fill="white",
+            font=("Press Start 2P", 20),
+            anchor="center"
+        )
+
+    def draw_menu_bg(self, item):
+        if self.menu_bg_shown == self.menu_bg_index:
+            return
+        frame = self.menu_bg.get(self.menu_bg_index)
+        if frame is not None:
+            self.canvas.itemconfig(item, image=frame)
+            self.menu_bg_shown = self.menu_bg_index
+            if self.first_frame_time is None:
+                self.first_frame_time = time.perf_counter() - self.load_start
+                print(f"Prvy snimok menu za {self.first_frame_time * 1000:.0f} ms")
+
+    def draw_menu(self):
+        self.draw_menu_bg(self.menu_bg_item)
+
+        # START je sivy, kym nie su nacitane obrazky do hry
+        if self.menu_start_ready != self.gameplay_ready:
+            self.menu_start_ready = self.gameplay_ready
+            if self.gameplay_ready:
+                self.canvas.itemconfig(self.start_rect, fill="#aa0000", outline="yellow")
+                self.canvas.itemconfig(self.start_text, text="START", font=("Press Start 2P", 30))
+            else:
+                self.canvas.itemconfig(self.start_rect, fill="#444444", outline="gray")
+                self.canvas.itemconfig(self.start_text, text="NACITAVAM", font=("Press Start 2P", 20))
+
+        if self.game_mode == "classic":
+            classic_fill = "#00aa00"
+            classic_outline = "white"
+            hardcore_fill = "#333333"
+            hardcore_outline = "gray"
+        else:
+            classic_fill = "#333333"
+            classic_outline = "gray"
+            hardcore_fill = "#aa5500"
+            hardcore_outline = "white"
+
+        self.canvas.itemconfig(self.classic_rect, fill=classic_fill, outline=classic_outline)
+        self.canvas.itemconfig(self.hardcore_rect, fill=hardcore_fill, outline=hardcore_outline)
+        self.canvas.itemconfig(self.menu_best_text, text=f"NAJLEPSIE SKORE: {self.best_score}")
+
+    def build_about(self):
+        self.about_bg_item = self.canvas.create_image(0, 0, anchor="nw")
+        self.menu_bg_shown = None
 
         w = self.width * 0.6
         h = self.height * 0.6
@@ -1241,7 +3292,36 @@ class Program:
             anchor="center"
         )
 
-    def draw_outlined_text(self,canvas, x, y, text, fill="white", outline="black", width=2, **kwargs):
+    def draw_about(self):
+        self.draw_menu_bg(self.about_bg_item)
+
+    def draw_outlined_text(self,canvas, x, y, text, fill="white", outline="black", width=2, tags=(), **kwargs):
+        if self.plain_text:
+            # nizsia kvalita: jedna textova polozka bez obrysu, bez novych obrazkov z atlasu
+            # aj bez (2 * width + 1)^2 poloziek obrysu cez Tk
+            canvas.create_text(x, y, text=text, fill=fill, tags=tags, **kwargs)
+            if tags:
+                self.outlined_pos[tags[0]] = (x, y)
+                self.outlined_text[tags[0]] = (None, None, text)
+            return
+
+        font = kwargs.get("font")
+        if (self.text_atlas is not None and font is not None and font[0] == "Press Start 2P"
+                and len(font) == 2 and set(kwargs) <= {"font", "anchor"}):
+            # z atlasu je cely text s obrysom jedna polozka canvasu
+            anchor = kwargs.get("anchor", "center")
+            dx = -width if "w" in anchor else width if "e" in anchor else 0
+            dy = -width if "n" in anchor else width if "s" in anchor else 0
+            style = (font[1], fill, outline, width)
+            photo = self.text_atlas.photo(text, *style)
+            item = canvas.create_image(x + dx, y + dy, image=photo, anchor=anchor, tags=tags)
+            self.text_images[item] = photo
+            if tags:
+                self.outlined_pos[tags[0]] = (x, y)
+                self.outlined_text[tags[0]] = (item, style, text)
+            return
+
+        # vsetky polozky textu dostanu spolocny tag, aby sa dali menit jednym volanim
         for dx in range(-width, width + 1):
             for dy in range(-width, width + 1):
                 if dx == 0 and dy == 0:
@@ -1251,25 +3331,51 @@ class Program:
                     y + dy,
                     text=text,
                     fill=outline,
+                    tags=tags,
                     **kwargs
                 )
         canvas.create_text(
             x, y,
             text=text,
             fill=fill,
+            tags=tags,
             **kwargs
         )
+        if tags:
+            self.outlined_pos[tags[0]] = (x, y)
+            self.outlined_text[tags[0]] = (None, None, text)
 
-    def draw_hud(self):
+    def set_outlined_text(self, canvas, tag, text):
+        item, style, current = self.outlined_text[tag]
+        if text == current:
+            return
+        if item is None:
+            canvas.itemconfig(tag, text=text)
+        else:
+            photo = self.text_atlas.photo(text, *style)
+            canvas.itemconfig(item, image=photo)
+            self.text_images[item] = photo
+        self.outlined_text[tag] = (item, style, text)
+
+    def move_outlined_text(self, canvas, tag, x, y):
+        old_x, old_y = self.outlined_pos[tag]
+        if x != old_x or y != old_y:
+            canvas.move(tag, x - old_x, y - old_y)
+            self.outlined_pos[tag] = (x, y)
+
+    def build_hud(self):
         line_y = self.height // 4
 
         self.canvas.create_rectangle(0,0,self.width, line_y-50, fill="black")
         self.canvas.create_rectangle(0, line_y-50, self.width, line_y, fill="lightblue")
 
-        for i in range(self.lives):
+        self.heart_items = []
+        for i in range(max(self.world.max_lives, self.world.lives)):
             x = 150 + i * 35
             y = line_y-40
-            self.canvas.create_image(x, y, image=self.heart_image, anchor="nw")
+            self.heart_items.append(
+                self.canvas.create_image(x, y, image=self.heart_image, anchor="nw")
+            )
 
         self.draw_outlined_text(
             self.canvas,
@@ -1294,195 +3400,297 @@ class Program:
             self.width, line_y, width=10,
             fill=None
         )
-        if self.crosshair_active:
-            cs = 10
-            self.canvas.create_line(
-                self.crosshair_x - cs, self.crosshair_y,
-                self.crosshair_x + cs, self.crosshair_y,
-                fill="red", width=2
-            )
-            self.canvas.create_line(
-                self.crosshair_x, self.crosshair_y - cs,
-                self.crosshair_x, self.crosshair_y + cs,
-                fill="red", width=2
-            )
-            if self.game_mode != "hardcore":
-                self.canvas.create_line(
-                    self.player.x, self.player.y,
-                    self.crosshair_x, self.crosshair_y,
-                    dash=5, fill="yellow"
-                )
-        bar_width = 60
-        bar_height = 8
-        bar_x1 = self.player.x - bar_width // 2
-        bar_y1 = self.player.y + self.player.height // 2
-        bar_x2 = bar_x1 + bar_width
-        bar_y2 = bar_y1 + bar_height
 
-        self.canvas.create_rectangle(
-            bar_x1, bar_y1,
-            bar_x2, bar_y2,
+        self.crosshair_h = self.canvas.create_line(0, 0, 0, 0, fill="red", width=2)
+        self.crosshair_v = self.canvas.create_line(0, 0, 0, 0, fill="red", width=2)
+        self.aim_line = self.canvas.create_line(0, 0, 0, 0, dash=5, fill="yellow")
+
+        self.cd_bar_bg = self.canvas.create_rectangle(
+            0, 0, 0, 0,
             fill="gray20",
             outline="black",
             width=1
         )
+        self.cd_bar_fill = self.canvas.create_rectangle(0, 0, 0, 0, outline="")
 
-        if self.max_fire_cooldown > 0:
-            ratio = self.fire_cooldown / self.max_fire_cooldown
-        else:
-            ratio = 0
-
-        fill_width = bar_width * ratio
-
-        if self.fire_cooldown > 0:
-            self.canvas.create_rectangle(
-                bar_x1, bar_y1,
-                bar_x1 + fill_width, bar_y2,
-                fill="orange",
-                outline=""
-            )
-        else:
-            self.canvas.create_rectangle(
-                bar_x1, bar_y1,
-                bar_x2, bar_y2,
-                fill="lime",
-                outline=""
-            )
-
-        if self.fire_cooldown != 0:
-            cd_text = str(self.fire_cooldown)
-            cd_color = "white"
-
-            self.draw_outlined_text(
+        self.draw_outlined_text(
             self.canvas,
-            self.player.x,
-            bar_y2 + 12,
-            text=cd_text,
-            fill=cd_color,
+            self.world.player.x,
+            self.world.player.y,
+            text="",
+            fill="white",
             outline="black",
             font=("Press Start 2P", 10),
-            anchor="center"
+            anchor="center",
+            tags=("hud_cd",)
         )
 
-
         self.draw_outlined_text(
             self.canvas,
             258, line_y-35,
-            text=f"SCORE:{self.score}",
+            text="",
             anchor="nw",
             fill="white",
             outline="black",
-            font=("Press Start 2P", 15)
+            font=("Press Start 2P", 15),
+            tags=("hud_score",)
         )
         self.draw_outlined_text(
             self.canvas,
             455, line_y-35,
-            text=f"NAJLEPSIE:{self.best_score}",
+            text="",
             anchor="nw",
             fill="white",
             outline="black",
-            font=("Press Start 2P", 15)
+            font=("Press Start 2P", 15),
+            tags=("hud_best",)
         )
         self.draw_outlined_text(
             self.canvas,
             self.width//2 - 100, line_y - 40,
-            text=f"LEVEL {self.level}",
+            text="",
             anchor="nw",
             fill="orange",
             outline="black",
-            font=("Press Start 2P", 20)
+            font=("Press Start 2P", 20),
+            tags=("hud_level",)
         )
-        origin_y = self.height // 4
-        local_x = int(self.player.x)-40
-        local_y = int(self.player.y - origin_y)-40
         self.draw_outlined_text(
             self.canvas,
             self.width - 300, line_y - 35,
-            text=f"PLAYER_X:{local_x}  PLAYER_Y:{local_y}",
+            text="",
             anchor="ne",
             fill="white",
             outline="black",
-            font=("Press Start 2P", 12)
+            font=("Press Start 2P", 12),
+            tags=("hud_pos",)
+        )
+        self.draw_outlined_text(
+            self.canvas,
+            self.width - 20, line_y - 35,
+            text="",
+            anchor="ne",
+            fill="white",
+            outline="black",
+            font=("Press Start 2P", 12),
+            tags=("hud_quality",)
         )
 
-        if not self.running and not self.game_over:
-            x1 = self.width // 4
-            y1 = self.height // 2 - 80
-            x2 = 3 * self.width // 4
-            y2 = self.height // 2 + 100
-
-            offset = 5
-            self.canvas.create_rectangle(
-                x1 + offset, y1 + offset,
-                x2 + offset, y2 + offset,
-                fill="lightyellow",
-                outline=""
-            )
-            self.canvas.create_rectangle(
-                x1, y1, x2, y2,
-                fill="#aa0000",
-                outline="yellow",
-                width=4
-            )
-            self.draw_outlined_text(
-                self.canvas,
-                (x1 + x2) // 2,
-                y1 + 50,
-                text="POZASTAVENE",
-                fill="white",
-                outline="black",
-                font=("Press Start 2P", 30),
-                anchor="center"
-            )
-            self.draw_outlined_text(
-                self.canvas,
-                (x1 + x2) // 2,
-                y1 + 90,
-                text="STLAC SPACE PRE POKRACOVANIE",
-                fill="yellow",
-                outline="black",
-                font=("Press Start 2P", 12),
-                anchor="center"
-            )
-            btn_w = 260
-            btn_h = 40
-            btn_x1 = (x1 + x2) // 2 - btn_w // 2
-            btn_x2 = btn_x1 + btn_w
-            btn_y1 = y1 + 130
-            btn_y2 = btn_y1 + btn_h
-
-            self.pause_exit_button = (btn_x1, btn_y1, btn_x2, btn_y2)
-
-            self.canvas.create_rectangle(
-                btn_x1, btn_y1, btn_x2, btn_y2,
-                fill="#444444",
-                outline="yellow",
-                width=3
-            )
+        x1 = self.width // 4
+        y1 = self.height // 2 - 80
+        x2 = 3 * self.width // 4
+        y2 = self.height // 2 + 100
 
-            self.draw_outlined_text(
-                self.canvas,
-                (btn_x1 + btn_x2) // 2,
-                (btn_y1 + btn_y2) // 2,
-                text="UKONCI HRU",
-                fill="white",
-                outline="black",
-                font=("Press Start 2P", 14),
-                anchor="center"
-            )
+        offset = 5
+        self.canvas.create_rectangle(
+            x1 + offset, y1 + offset,
+            x2 + offset, y2 + offset,
+            fill="lightyellow",
+            outline="",
+            tags=("pause",)
+        )
+        self.canvas.create_rectangle(
+            x1, y1, x2, y2,
+            fill="#aa0000",
+            outline="yellow",
+            width=4,
+            tags=("pause",)
+        )
+        self.draw_outlined_text(
+            self.canvas,
+            (x1 + x2) // 2,
+            y1 + 50,
+            text="POZASTAVENE",
+            fill="white",
+            outline="black",
+            font=("Press Start 2P", 30),
+            anchor="center",
+            tags=("pause",)
+        )
+        self.draw_outlined_text(
+            self.canvas,
+            (x1 + x2) // 2,
+            y1 + 90,
+            text="STLAC SPACE PRE POKRACOVANIE",
+            fill="yellow",
+            outline="black",
+            font=("Press Start 2P", 12),
+            anchor="center",
+            tags=("pause",)
+        )
+        btn_w = 260
+        btn_h = 40
+        btn_x1 = (x1 + x2) // 2 - btn_w // 2
+        btn_x2 = btn_x1 + btn_w
+        btn_y1 = y1 + 130
+        btn_y2 = btn_y1 + btn_h
 
-        else:
-            self.pause_exit_button = None
+        self.pause_button_rect = (btn_x1, btn_y1, btn_x2, btn_y2)
 
-        if self.game_over:
-            self.canvas.create_text(
-                self.width // 2, self.height // 2 - 30,
-                text="HRA SKONCILA\n", fill="red", font=("Press Start 2P", 54, "bold")
-            )
-            self.canvas.create_text(
-                self.width // 2, self.height // 2 + 20,
-                text="klikni mysou pre restart",
-                fill="white", font=("Press Start 2P", 20)
-            )
+        self.canvas.create_rectangle(
+            btn_x1, btn_y1, btn_x2, btn_y2,
+            fill="#444444",
+            outline="yellow",
+            width=3,
+            tags=("pause",)
+        )
+
+        self.draw_outlined_text(
+            self.canvas,
+            (btn_x1 + btn_x2) // 2,
+            (btn_y1 + btn_y2) // 2,
+            text="UKONCI HRU",
+            fill="white",
+            outline="black",
+            font=("Press Start 2P", 14),
+            anchor="center",
+            tags=("pause",)
+        )
+
+        self.canvas.create_text(
+            self.width // 2, self.height // 2 - 30,
+            text="HRA SKONCILA\n", fill="red", font=("Press Start 2P", 54, "bold"),
+            tags=("game_over",)
+        )
+        self.canvas.create_text(
+            self.width // 2, self.height // 2 + 20,
+            text="klikni mysou pre restart",
+            fill="white", font=("Press Start 2P", 20),
+            tags=("game_over",)
+        )
+
+        for tag in ("pause", "game_over"):
+            self.canvas.itemconfig(tag, state="hidden")
+            self.item_shown[tag] = False
+
+    def hud_changed(self, key, value):
+        # HUD sa dotkne canvasu len vtedy, ked sa zmeni hodnota, ktoru zobrazuje
+        if key in self.hud_values and self.hud_values[key] == value:
+            return False
+        self.hud_values[key] = value
+        self.hud_updates += 1
+        return True
+
+    def draw_hud(self):
+        world = self.world
+        player = world.player
+
+        if self.hud_changed("lives", world.lives):
+            for i, heart in enumerate(self.heart_items):
+                self.show(heart, i < world.lives)
+
+        aim = world.crosshair_active and self.game_mode != "hardcore"
+        crosshair = (world.crosshair_active, world.crosshair_x, world.crosshair_y,
+                     (player.draw_x, player.draw_y) if aim else None)
+        if self.hud_changed("crosshair", crosshair):
+            if world.crosshair_active:
+                cs = 10
+                self.canvas.coords(
+                    self.crosshair_h,
+                    world.crosshair_x - cs, world.crosshair_y,
+                    world.crosshair_x + cs, world.crosshair_y
+                )
+                self.canvas.coords(
+                    self.crosshair_v,
+                    world.crosshair_x, world.crosshair_y - cs,
+                    world.crosshair_x, world.crosshair_y + cs
+                )
+                if aim:
+                    self.canvas.coords(
+                        self.aim_line,
+                        player.draw_x, player.draw_y,
+                        world.crosshair_x, world.crosshair_y
+                    )
+            self.show(self.crosshair_h, world.crosshair_active)
+            self.show(self.crosshair_v, world.crosshair_active)
+            self.show(self.aim_line, aim)
+
+        bar_width = 60
+        bar_height = 8
+        bar_x1 = player.draw_x - bar_width // 2
+        bar_y1 = player.draw_y + player.height // 2
+        bar_x2 = bar_x1 + bar_width
+        bar_y2 = bar_y1 + bar_height
 
-Program()
+        if self.hud_changed("cd_bar", (bar_x1, bar_y1, world.fire_cooldown)):
+            self.canvas.coords(self.cd_bar_bg, bar_x1, bar_y1, bar_x2, bar_y2)
+
+            if world.max_fire_cooldown > 0:
+                ratio = world.fire_cooldown / world.max_fire_cooldown
+            else:
+                ratio = 0
+
+            fill_width = bar_width * ratio
+
+            if world.fire_cooldown > 0:
+                self.canvas.coords(self.cd_bar_fill, bar_x1, bar_y1, bar_x1 + fill_width, bar_y2)
+            else:
+                self.canvas.coords(self.cd_bar_fill, bar_x1, bar_y1, bar_x2, bar_y2)
+
+            if self.hud_changed("cd_color", world.fire_cooldown > 0):
+                self.canvas.itemconfig(self.cd_bar_fill, fill="orange" if world.fire_cooldown > 0 else "lime")
+
+            if world.fire_cooldown != 0:
+                self.set_outlined_text(self.canvas, "hud_cd", str(math.ceil(world.fire_cooldown)))
+                self.move_outlined_text(self.canvas, "hud_cd", player.draw_x, bar_y2 + 12)
+            self.show("hud_cd", world.fire_cooldown != 0)
+
+        if self.hud_changed("score", world.score):
+            self.set_outlined_text(self.canvas, "hud_score", f"SCORE:{world.score}")
+        if self.hud_changed("best", self.best_score):
+            self.set_outlined_text(self.canvas, "hud_best", f"NAJLEPSIE:{self.best_score}")
+        if self.hud_changed("level", world.level):
+            self.set_outlined_text(self.canvas, "hud_level", f"LEVEL {world.level}")
+        if self.hud_changed("quality", (self.quality.level, self.quality.pinned)):
+            pin = "*" if self.quality.pinned is not None else ""
+            self.set_outlined_text(self.canvas, "hud_quality", f"KVALITA {self.quality.level}{pin}")
+
+        origin_y = self.height // 4
+        local_x = int(player.x)-40
+        local_y = int(player.y - origin_y)-40
+        if self.hud_changed("pos", (local_x, local_y)):
+            self.set_outlined_text(self.canvas, "hud_pos", f"PLAYER_X:{local_x}  PLAYER_Y:{local_y}")
+
+        paused = not self.running and not world.game_over
+        if self.hud_changed("paused", paused):
+            self.show("pause", paused)
+            if paused:
+                self.pause_exit_button = self.pause_button_rect
+            else:
+                self.pause_exit_button = None
+
+        if self.hud_changed("game_over", world.game_over):
+            self.show("game_over", world.game_over)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SPACE SHOOTER")
+    parser.add_argument("--headless", type=int, metavar="TICKS",
+                        help="spusti simulaciu bez okna na zadany pocet tickov")
+    parser.add_argument("--tick-rate", type=int, choices=(20, 40, 60, 120), default=BASE_TICK_RATE,
+                        help="pocet tickov simulacie za sekundu")
+    parser.add_argument("--max-fps", type=int, default=120,
+                        help="horny limit vykreslenych snimkov za sekundu (0 = bez limitu)")
+    parser.add_argument("--perf", action="store_true",
+                        help="zapne prehlad vykonu hned po spusteni (inak klavesa F3)")
+    parser.add_argument("--perf-csv", metavar="SUBOR",
+                        help="zapisuje statistiky vykonu kazdu sekundu do CSV suboru")
+    parser.add_argument("--record", nargs="?", const="replays", metavar="PRIECINOK",
+                        help="kazdu hru zaznamena do priecinka (predvolene replays)")
+    parser.add_argument("--quality", type=int, choices=range(len(QualityGovernor.levels)),
+                        help="pevna uroven kvality 0-4 (inak sa meni podla vykonu)")
+    parser.add_argument("--frame-budget", type=float, default=25.0, metavar="MS",
+                        help="rozpocet casu na snimok pre automaticku kvalitu")
+    parser.add_argument("--waves", metavar="SUBOR",
+                        help="nepriatelia podla rozpisu vln z JSON/TOML (napr. waves/stress_200.json)")
+    parser.add_argument("--replay", metavar="SUBOR",
+                        help="prehra zaznam hry bez okna a overi, ci sa zhoduje")
+    args = parser.parse_args()
+
+    if args.replay:
+        raise SystemExit(0 if run_replay(args.replay, waves=args.waves) is not False else 1)
+    elif args.headless:
+        run_headless(args.headless, tick_rate=args.tick_rate, waves=args.waves)
+    else:
+        Program(tick_rate=args.tick_rate, max_fps=args.max_fps,
+                perf_overlay=args.perf, perf_csv=args.perf_csv, record_dir=args.record,
+                quality=args.quality, frame_budget=args.frame_budget, waves=args.waves)
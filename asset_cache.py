@@ -0,0 +1,301 @@
+import hashlib
+import mmap
+import os
+import queue
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageSequence
+
+
+# Cache uz zmensenych RGBA snimkov na disku, aby sa obrazky nemuseli pri kazdom
+# spusteni dekodovat a prepocitavat. Jeden subor = jeden zdroj v jednej velkosti:
+# hlavicka a za nou surove RGBA snimky za sebou, takze sa daju priamo namapovat.
+# Cely priecinok ma strop MAX_CACHE_BYTES, pri prekroceni idu prec najdlhsie
+# nepouzite subory, aj pre ine rozlisenia.
+
+CACHE_DIR = ".asset_cache"
+MAGIC = b"SSAC"
+VERSION = 3
+# verzia je aj v pripone, subory starsieho formatu zmaze trim_cache
+EXTENSION = f".v{VERSION}.ssac"
+# magic, verzia, pocet snimkov, sirka, vyska
+HEADER = struct.Struct("<4sIIII")
+# GIF menu v 4K ma sam asi 400 MB
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+stats = {"hits": 0, "misses": 0}
+
+
+def cache_key(path, size, resample):
+    st = os.stat(path)
+    # zmena obsahu zmeni velkost alebo mtime, takze stary zaznam sa uz nenajde
+    sig = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{size[0]}x{size[1]}|{int(resample)}|{VERSION}"
+    return hashlib.sha1(sig.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_prefix(path, size, resample):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}_{size[0]}x{size[1]}_{int(resample)}_"
+
+
+def cache_location(path, size, resample, cache_dir):
+    size = (int(size[0]), int(size[1]))
+    prefix = cache_prefix(path, size, resample)
+    cache_file = os.path.join(cache_dir, prefix + cache_key(path, size, resample) + EXTENSION)
+    return size, prefix, cache_file
+
+
+def iter_frames(path, size, resample):
+    with Image.open(path) as im:
+        for frame in ImageSequence.Iterator(im):
+            frame = frame.convert("RGBA")
+            if frame.size != size:
+                frame = frame.resize(size, resample)
+            yield frame
+
+
+def decode_frames(path, size, resample, on_frame=None):
+    frames = []
+    for frame in iter_frames(path, size, resample):
+        if on_frame is not None:
+            on_frame(len(frames), frame)
+        frames.append(frame)
+    return frames
+
+
+def read_header(data, file_size, size):
+    magic, version, count, w, h = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or (w, h) != tuple(size):
+        raise ValueError("neplatny cache subor")
+    if file_size != HEADER.size + count * w * h * 4:
+        raise ValueError("neuplny cache subor")
+    return count, (w, h)
+
+
+def read_cache(cache_file, size):
+    with open(cache_file, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    count, size = read_header(mm, len(mm), size)
+    frame_bytes = size[0] * size[1] * 4
+
+    # snimky zdielaju pamat s namapovanym suborom, nic sa nekopiruje ani nedekoduje
+    view = memoryview(mm)
+    frames = []
+    for i in range(count):
+        start = HEADER.size + i * frame_bytes
+        frames.append(Image.frombuffer(
+            "RGBA", size, view[start:start + frame_bytes], "raw", "RGBA", 0, 1
+        ))
+    return frames
+
+
+def write_cache(cache_dir, prefix, cache_file, frames, size, max_bytes=MAX_CACHE_BYTES):
+    # frames moze byt aj generator, pocet snimkov sa do hlavicky dopise na konci
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, size[0], size[1]))
+        count = 0
+        for frame in frames:
+            f.write(frame.tobytes())
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, count, size[0], size[1]))
+    os.replace(tmp_file, cache_file)
+    # starsie verzie toho isteho zdroja v tejto velkosti sa zmazu hned, ostatne podla stropu
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and full != cache_file and not name.endswith(".tmp"):
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+    trim_cache(cache_dir, max_bytes, keep=cache_file)
+
+
+def trim_cache(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=None):
+    # subory stareho formatu a opustene .tmp idu prec, potom najdlhsie nepouzite,
+    # kym sa cache nezmesti pod strop; pouzitie znaci mtime, citanie ho obnovi
+    now = time.time()
+    files = []
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(full)
+            if name.endswith(".tmp"):
+                # .tmp moze prave zapisovat ine vlakno
+                if now - st.st_mtime > 3600:
+                    os.remove(full)
+                continue
+            if not name.endswith(EXTENSION):
+                os.remove(full)
+                continue
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, full))
+    total = sum(size for _, size, _ in files)
+    for _, size, full in sorted(files):
+        if total <= max_bytes:
+            break
+        if full == keep:
+            continue
+        try:
+            os.remove(full)
+        except OSError:
+            continue
+        total -= size
+
+
+def touch(cache_file):
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+
+
+def load_frames(path, size, resample=Image.LANCZOS, cache_dir=CACHE_DIR, on_frame=None):
+    # on_frame(index, snimok) dostane kazdy snimok hned, ako je hotovy
+    size, prefix, cache_file = cache_location(path, size, resample, cache_dir)
+
+    if os.path.exists(cache_file):
+        try:
+            frames = read_cache(cache_file, size)
+            stats["hits"] += 1
+            touch(cache_file)
+            if on_frame is not None:
+                for i, frame in enumerate(frames):
+                    on_frame(i, frame)
+            return frames
+        except (OSError, ValueError, struct.error) as e:
+            print("Chyba pri citani cache, obrazok sa nacita znova:", e)
+
+    stats["misses"] += 1
+    frames = decode_frames(path, size, resample, on_frame)
+    try:
+        write_cache(cache_dir, prefix, cache_file, frames, size)
+    except OSError as e:
+        print("Cache obrazkov sa nepodarilo zapisat:", e)
+    return frames
+
+
+def load_image(path, size, resample=Image.LANCZOS, cache_dir=CACHE_DIR):
+    return load_frames(path, size, resample, cache_dir)[0]
+
+
+class FrameFile:
+    # snimky z namapovaneho cache suboru sa vytvaraju az pri pristupe a zdielaju s nim
+    # pamat; do RAM sa dostanu len stranky snimkov, ktore sa naozaj citaju
+    def __init__(self, cache_file, size):
+        with open(cache_file, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.count, self.size = read_header(self.mm, len(self.mm), size)
+        except Exception:
+            self.mm.close()
+            raise
+        self.frame_bytes = self.size[0] * self.size[1] * 4
+        self.view = memoryview(self.mm)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = HEADER.size + index * self.frame_bytes
+        if hasattr(self.mm, "madvise"):
+            # jadro nacita stranky snimku dopredu, kym ho hlavne vlakno nepotrebuje
+            page = start - start % mmap.PAGESIZE
+            self.mm.madvise(mmap.MADV_WILLNEED, page, start + self.frame_bytes - page)
+        return Image.frombuffer(
+            "RGBA", self.size, self.view[start:start + self.frame_bytes], "raw", "RGBA", 0, 1
+        )
+
+    def close(self):
+        self.view.release()
+        try:
+            self.mm.close()
+        except BufferError:
+            # niektory snimok este drzi pohlad do suboru, mapovanie zanikne s nim
+            pass
+
+
+def stream_frames(path, size, resample=Image.LANCZOS, cache_dir=CACHE_DIR, on_frame=None):
+    # snimky sa dekoduju rovno do cache suboru a citaju sa z neho po jednom,
+    # takze cela animacia nie je v pamati naraz ani pri prvom spusteni
+    size, prefix, cache_file = cache_location(path, size, resample, cache_dir)
+
+    if os.path.exists(cache_file):
+        try:
+            frames = FrameFile(cache_file, size)
+            stats["hits"] += 1
+            touch(cache_file)
+            return frames
+        except (OSError, ValueError, struct.error) as e:
+            print("Chyba pri citani cache, obrazok sa nacita znova:", e)
+
+    stats["misses"] += 1
+
+    def decoded():
+        for i, frame in enumerate(iter_frames(path, size, resample)):
+            if on_frame is not None:
+                on_frame(i, frame)
+            yield frame
+
+    try:
+        write_cache(cache_dir, prefix, cache_file, decoded(), size)
+    except OSError as e:
+        print("Cache obrazkov sa nepodarilo zapisat:", e)
+        return decode_frames(path, size, resample)
+    return FrameFile(cache_file, size)
+
+
+class AssetLoader:
+    # dekodovanie a zmensovanie bezi vo vlaknach (PIL pri tom pusta GIL),
+    # vysledky si hlavne vlakno vybera cez poll a az tam z nich robi PhotoImage
+    def __init__(self, workers=None):
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.results = queue.Queue()
+        self.pending = 0
+
+    def submit(self, name, fn, *args, **kwargs):
+        self.pending += 1
+        self.executor.submit(self.run, name, fn, args, kwargs)
+
+    def submit_frames(self, name, path, size, resample=Image.LANCZOS):
+        # snimky animacie chodia po jednom, aby sa dali ukazat skor nez je hotova cela
+        def on_frame(index, frame):
+            self.results.put(("frame", name, (index, frame)))
+        self.submit(name, stream_frames, path, size, resample, on_frame=on_frame)
+
+    def run(self, name, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.results.put(("error", name, e))
+        else:
+            self.results.put(("done", name, result))
+
+    def poll(self, budget=None):
+        # vracia hotove vysledky, kym nevyprsi cas, aby sa nezasekol frame
+        start = time.perf_counter()
+        while True:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if item[0] != "frame":
+                self.pending -= 1
+            yield item
+            if budget is not None and time.perf_counter() - start >= budget:
+                return
+
+    @property
+    def done(self):
+        return self.pending == 0 and self.results.empty()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
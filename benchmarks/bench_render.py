@@ -0,0 +1,137 @@
+import math
+from types import SimpleNamespace
+
+from harness import benchmark
+
+import HRA
+
+canvas_holder = {}
+
+
+def get_canvas():
+    # jedno skryte okno pre vsetky benchmarky, ktore potrebuju Tk
+    if "canvas" not in canvas_holder:
+        root = HRA.tkinter.Tk()
+        root.withdraw()
+        canvas = HRA.tkinter.Canvas(root, width=1280, height=720)
+        canvas.pack()
+        for layer in ("shields", "player", "enemies", "particles", "projectiles", "bullets"):
+            canvas.create_line(0, 0, 0, 0, state="hidden", tags=("layer:" + layer,))
+        canvas_holder["root"] = root
+        canvas_holder["canvas"] = canvas
+    return canvas_holder["canvas"]
+
+
+def flush():
+    canvas_holder["root"].update_idletasks()
+
+
+@benchmark("player_draw_rotation", number=72, needs_tk=True, unit="snimok")
+def player_draw_rotation():
+    canvas = get_canvas()
+    player = HRA.Player(640, 500, base_img=HRA.load_player_image())
+    player.rotations.prebuild()
+    state = {"angle": 0}
+
+    def run():
+        state["angle"] = (state["angle"] + 5) % 360
+        player.set_angle(state["angle"])
+        player.draw(canvas)
+        flush()
+
+    return run, None
+
+
+@benchmark("bullet_draw_rotation_100", number=20, needs_tk=True, unit="snimok so 100 strelami")
+def bullet_draw_rotation():
+    canvas = get_canvas()
+    atlas = HRA.RotationCache(HRA.load_frames("giphy.gif", (60, 120)), buckets=72,
+                              max_bytes=32 * 1024 * 1024)
+    bullets = []
+    for i in range(100):
+        angle = math.radians(i * 360 / 100)
+        bullets.append(HRA.PlayerBullet(640, 400, math.cos(angle) * 2, math.sin(angle) * 2,
+                                        color="cyan", atlas=atlas))
+
+    def run():
+        for b in bullets:
+            b.update()
+            b.draw(canvas)
+        flush()
+
+    def setup():
+        for b in bullets:
+            b.x = b.prev_x = 640
+            b.y = b.prev_y = 400
+
+    return run, setup
+
+
+def particles_draw(count):
+    def factory():
+        from bench_world import particle_system
+        canvas = get_canvas()
+        particles = particle_system(count)
+        particles.draw(canvas)
+        flush()
+
+        def run():
+            particles.update(1.0)
+            particles.draw(canvas, 0.5)
+            flush()
+
+        return run, None
+    return factory
+
+
+benchmark("particles_draw_1k", number=10, needs_tk=True, unit="snimok")(particles_draw(1000))
+benchmark("particles_draw_10k", number=3, needs_tk=True, unit="snimok")(particles_draw(10000))
+
+
+def text_program(use_atlas):
+    # draw_outlined_text je metoda Programu, staci jej objekt s atributmi, ktore pouziva
+    canvas = get_canvas()
+    atlas = None
+    if use_atlas:
+        atlas = HRA.TextAtlas(HRA.load_font_data(), canvas_holder["root"].winfo_fpixels("1p"))
+    return canvas, SimpleNamespace(text_atlas=atlas, plain_text=False, text_images={},
+                                   outlined_pos={}, outlined_text={})
+
+
+def outlined_text_create(use_atlas):
+    def factory():
+        canvas, program = text_program(use_atlas)
+
+        def run():
+            HRA.Program.draw_outlined_text(program, canvas, 258, 145, text="SCORE:1234",
+                                           anchor="nw", fill="white", outline="black",
+                                           font=("Press Start 2P", 15), tags=("bench_text",))
+            flush()
+            canvas.delete("bench_text")
+
+        return run, None
+    return factory
+
+
+def outlined_text_update(use_atlas):
+    # ako HUD: text sa vytvori raz a potom sa meni len skore
+    def factory():
+        canvas, program = text_program(use_atlas)
+        HRA.Program.draw_outlined_text(program, canvas, 258, 145, text="", anchor="nw",
+                                       fill="white", outline="black",
+                                       font=("Press Start 2P", 15), tags=("bench_hud",))
+        state = {"score": 0}
+
+        def run():
+            state["score"] = (state["score"] + 1) % 200
+            HRA.Program.set_outlined_text(program, canvas, "bench_hud", f"SCORE:{state['score']}")
+            flush()
+
+        return run, None
+    return factory
+
+
+benchmark("outlined_text_create_atlas", number=50, needs_tk=True)(outlined_text_create(True))
+benchmark("outlined_text_create_tk", number=50, needs_tk=True)(outlined_text_create(False))
+benchmark("outlined_text_update_atlas", number=200, needs_tk=True)(outlined_text_update(True))
+benchmark("outlined_text_update_tk", number=200, needs_tk=True)(outlined_text_update(False))
@@ -0,0 +1,255 @@
+import math
+import random
+
+import numpy as np
+from harness import benchmark
+
+import HRA
+
+WIDTH = 1280
+HEIGHT = 720
+
+
+def make_world(level=1, game_mode="classic", masks=True):
+    # masks=False necha zasahy len na obdlznikoch, na porovnanie s alfa maskami
+    world = HRA.World(WIDTH, HEIGHT, player_img=HRA.load_player_image(),
+                      masks=HRA.load_enemy_masks() if masks else None)
+    world.reset_game(game_mode)
+    world.score = (level - 1) * 10
+    world.level = level
+    return world
+
+
+def playfield_point(rng, margin=30):
+    return (rng.uniform(margin, WIDTH - margin),
+            rng.uniform(HEIGHT // 4 + margin, HEIGHT - margin))
+
+
+def fill_collision(world, bullets, enemies, seed):
+    rng = random.Random(seed)
+    world.bullet_pool.release_all(world.player_bullets)
+    world.enemies.clear()
+    world.player_bullets.clear()
+    for _ in range(enemies):
+        x, y = playfield_point(rng)
+        world.enemies.spawn(x, y, 2, size=world.enemy_size)
+    for _ in range(bullets):
+        x, y = playfield_point(rng)
+        angle = rng.uniform(0, 2 * math.pi)
+        world.player_bullets.append(
+            world.bullet_pool.acquire(x, y, math.cos(angle) * 20, math.sin(angle) * 20)
+        )
+
+
+def collision_matrix(bullets, enemies, masks=True):
+    def factory():
+        world = make_world(masks=masks)
+        return world.collide_bullets, lambda: fill_collision(world, bullets, enemies, 1)
+    return factory
+
+
+def collision_bruteforce(bullets, enemies):
+    # povodna slucka kazda strela x kazdy nepriatel v Pythone, na porovnanie s maticou
+    def factory():
+        world = make_world()
+
+        def run():
+            check = world.check_collision
+            enemies = world.enemies
+            enemy_boxes = list(enumerate(zip(*(c.tolist() for c in enemies.bboxes()))))
+            for b in world.player_bullets:
+                bb = b.get_bbox()
+                for i, enemy_bb in enemy_boxes:
+                    if enemies.dying[i]:
+                        continue
+                    if check(bb, enemy_bb):
+                        enemies.start_dying(i)
+                        break
+
+        return run, lambda: fill_collision(world, bullets, enemies, 1)
+    return factory
+
+
+for n, m in ((10, 10), (50, 50), (200, 100), (1000, 500)):
+    benchmark(f"collision_matrix_{n}x{m}")(collision_matrix(n, m))
+    benchmark(f"collision_aabb_{n}x{m}")(collision_matrix(n, m, masks=False))
+    benchmark(f"collision_bruteforce_{n}x{m}")(collision_bruteforce(n, m))
+
+
+def player_hits(projectiles, masks):
+    # strely letia na hraca zo vsetkych stran, vacsina prejde hitboxom, s maskou
+    # sa este overia pixely
+    def factory():
+        world = make_world(masks=masks)
+        player = world.player
+        player.set_angle(45)
+
+        def setup():
+            rng = random.Random(5)
+            world.projectiles.clear()
+            for _ in range(projectiles):
+                angle = rng.uniform(0, 2 * math.pi)
+                dist = rng.uniform(20, 60)
+                x = player.x + math.cos(angle) * dist
+                y = player.y + math.sin(angle) * dist
+                world.spawn_projectile(x, y, -math.cos(angle) * 6, -math.sin(angle) * 6)
+            world.projectiles.update(1.0, WIDTH, HEIGHT)
+
+        return (lambda: world.projectiles.swept_hits(player)), setup
+    return factory
+
+
+for masks, label in ((True, "mask"), (False, "aabb")):
+    benchmark(f"player_hits_{label}_50")(player_hits(50, masks))
+
+
+def enemy_update(kind, count=100, level=10):
+    def factory():
+        world = make_world(level)
+        rng = random.Random(2)
+        enemies = HRA.EnemyManager(rng=rng)
+        for _ in range(count):
+            # dost daleko od okrajov, aby pocas kola nikto neodisiel z obrazovky
+            x = rng.uniform(160, WIDTH - 160)
+            y = rng.uniform(HEIGHT // 4 + 30, HEIGHT // 2)
+            enemies.spawn(x, y, rng.randint(2, 3 + level), can_shoot=kind != "chaser",
+                          kind=kind, size=world.enemy_size)
+        start = [arr.copy() for arr in enemies.arrays()]
+
+        def setup():
+            # nepriatelia sa vratia na start, aby kazde kolo robilo to iste
+            for arr, saved in zip(enemies.arrays(), start):
+                arr[:len(saved)] = saved
+            enemies.count = count
+            world.projectiles.clear()
+
+        def run():
+            enemies.update(world.spawn_projectile, WIDTH, HEIGHT,
+                           player=world.player, level=level, dt=1.0)
+
+        return run, setup
+    return factory
+
+
+for kind in ("basic", "zigzag", "chaser"):
+    benchmark(f"enemy_update_{kind}_100", number=20, unit="100 nepriatelov")(enemy_update(kind))
+
+
+def particle_system(count):
+    # dlha zivotnost, aby bol pocet castic pocas celeho kola rovnaky
+    particles = HRA.ParticleSystem(capacity=count, budget=count, seed=1)
+    rng = random.Random(4)
+    while len(particles) < count:
+        x, y = playfield_point(rng)
+        particles.burst(x, y, min(40, count - len(particles)), ("#ffffff", "#ffcc33", "#ff8800"),
+                        life=(1000, 2000))
+    particles.spawned = 0
+    return particles
+
+
+def particles_update(count):
+    def factory():
+        particles = particle_system(count)
+        return (lambda: particles.update(1.0)), None
+    return factory
+
+
+def particles_burst(count):
+    # prazdny system sa naplni vybuchmi po 40 casticiach, ako v hre
+    def factory():
+        particles = HRA.ParticleSystem(capacity=count, budget=count, seed=1)
+        palette = ("#ffffff", "#ffcc33", "#ff8800")
+
+        def run():
+            particles.burst(640, 360, 40, palette)
+
+        def setup():
+            particles.clear()
+            particles.spawned = 0
+
+        return run, setup
+    return factory
+
+
+for count, label in ((1000, "1k"), (10000, "10k")):
+    benchmark(f"particles_update_{label}", number=20, unit="tick")(particles_update(count))
+benchmark("particles_burst_40", number=25, unit="vybuch")(particles_burst(1000))
+
+
+def scripted_input(world, t):
+    # jednoduchy skript: hrac sa hybe zo strany na stranu a striela na najblizsieho nepriatela
+    world.player.vx = world.player.speed if (t // 40) % 2 == 0 else -world.player.speed
+    enemies = world.enemies
+    n = enemies.count
+    if n:
+        x = enemies.x[:n]
+        y = enemies.y[:n]
+        i = int(np.argmin(np.abs(x - world.player.x) + np.abs(y - world.player.y)))
+        world.crosshair_x = float(x[i])
+        world.crosshair_y = max(float(y[i]), world.line_y + 1)
+    world.fire_bullet()
+
+
+def scenario(level, enemies, projectiles):
+    def factory():
+        world = make_world(level)
+
+        def setup():
+            random.seed(3)
+            world.reset_game("classic")
+            world.score = (level - 1) * 10
+            world.level = level
+            # hrac je nezranitelny, aby sa scenar neprerusil koncom hry
+            world.invincible = True
+            for _ in range(enemies):
+                world.spawn_enemy()
+                i = world.enemies.count - 1
+                x, y = playfield_point(random)
+                world.enemies.x[i] = world.enemies.prev_x[i] = world.enemies.base_x[i] = x
+                world.enemies.y[i] = world.enemies.prev_y[i] = y
+            for _ in range(projectiles):
+                x, y = playfield_point(random, 0)
+                angle = random.uniform(0, 2 * math.pi)
+                speed = random.uniform(2, 6)
+                world.spawn_projectile(x, y, math.cos(angle) * speed, math.sin(angle) * speed)
+            state["t"] = 0
+
+        state = {"t": 0}
+
+        def run():
+            scripted_input(world, state["t"])
+            world.tick_game()
+            state["t"] += 1
+
+        return run, setup
+    return factory
+
+
+benchmark("scenario_level10_50e_300p", number=40, unit="tick")(scenario(10, 50, 300))
+benchmark("scenario_level1_fresh", number=400, unit="tick")(scenario(1, 0, 0))
+
+
+def stress(name, level=10):
+    # zatazovy profil z waves/, pocet nepriatelov urcuje subor a nie nahoda
+    def factory():
+        world = make_world(level)
+        world.set_waves(HRA.load_waves(f"waves/{name}.json", WIDTH, HEIGHT, HRA.ENEMY_KINDS))
+        state = {"t": 0}
+
+        def setup():
+            world.reset_game("classic", seed=3)
+            world.score = (level - 1) * 10
+            world.invincible = True
+            state["t"] = 0
+
+        def run():
+            scripted_input(world, state["t"])
+            world.tick_game()
+            state["t"] += 1
+
+        return run, setup
+    return factory
+
+
+benchmark("stress_200_static", number=40, unit="tick")(stress("stress_200"))
+benchmark("stress_stream", number=200, unit="tick")(stress("stress_stream"))
@@ -0,0 +1,104 @@
+import gc
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class Benchmark:
+    # run sa v jednom kole zavola number-krat, setup pripravi stav pred kazdym kolom
+    # a do casu sa nezapocita
+    def __init__(self, name, run, setup=None, number=1, needs_tk=False, unit="volanie"):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.number = number
+        self.needs_tk = needs_tk
+        self.unit = unit
+
+
+registry = []
+
+
+def benchmark(name, number=1, needs_tk=False, unit="volanie"):
+    # funkcia dostane seed a vrati (run, setup), az ked sa benchmark naozaj spusta
+    def wrap(factory):
+        registry.append((name, factory, number, needs_tk, unit))
+        return factory
+    return wrap
+
+
+def measure(bench, repeat, warmup=2):
+    for _ in range(warmup):
+        if bench.setup is not None:
+            bench.setup()
+        for _ in range(bench.number):
+            bench.run()
+
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if bench.setup is not None:
+                bench.setup()
+            run = bench.run
+            start = time.perf_counter()
+            for _ in range(bench.number):
+                run()
+            times.append((time.perf_counter() - start) / bench.number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    times_us = [t * 1e6 for t in times]
+    return {
+        "median_us": statistics.median(times_us),
+        "min_us": min(times_us),
+        "max_us": max(times_us),
+        "stdev_us": statistics.stdev(times_us) if len(times_us) > 1 else 0.0,
+        "repeat": repeat,
+        "number": bench.number,
+        "unit": bench.unit,
+    }
+
+
+def build(name, factory, number, needs_tk, unit, seed):
+    random.seed(seed)
+    run, setup = factory()
+    return Benchmark(name, run, setup, number, needs_tk, unit)
+
+
+@contextmanager
+def virtual_display(width=1280, height=720):
+    # Tk potrebuje X server; ak ziadny nebezi, skusi sa Xvfb, inak sa vrati False
+    if os.environ.get("DISPLAY") or sys.platform != "linux":
+        yield True
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        yield False
+        return
+
+    display = f":{90 + os.getpid() % 100}"
+    proc = subprocess.Popen(
+        [xvfb, display, "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5)
+        yield proc.poll() is None
+    finally:
+        del os.environ["DISPLAY"]
+        proc.terminate()
+        proc.wait()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from harness import ROOT, build, measure, registry, virtual_display
+
+os.chdir(ROOT)
+
+import numpy as np  # noqa: E402
+import bench_world  # noqa: E402,F401
+import bench_render  # noqa: E402,F401
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def run_all(names, repeat, seed):
+    results = {}
+    selected = [entry for entry in registry if entry[0] in names]
+    world = [e for e in selected if not e[3]]
+    tk = [e for e in selected if e[3]]
+
+    def run_group(group):
+        for name, factory, number, needs_tk, unit in group:
+            bench = build(name, factory, number, needs_tk, unit, seed)
+            results[name] = measure(bench, repeat)
+            r = results[name]
+            print(f"{name:<36} {r['median_us']:12.1f} us / {unit}"
+                  f"  (min {r['min_us']:.1f}, stdev {r['stdev_us']:.1f})")
+
+    run_group(world)
+    if tk:
+        with virtual_display() as ok:
+            if ok:
+                run_group(tk)
+            else:
+                print("Tk benchmarky sa preskakuju: nebezi X server a Xvfb nie je nainstalovany")
+    return results
+
+
+def compare(results, baseline, threshold):
+    # spomalenie nad prah sa hlasi ako regresia, navratovy kod je potom 1
+    regressions = []
+    print()
+    print(f"{'benchmark':<36} {'baseline':>12} {'teraz':>12} {'pomer':>7}")
+    for name, r in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<36} {'-':>12} {r['median_us']:12.1f}    nove")
+            continue
+        ratio = r["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESIA"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  zlepsenie"
+        print(f"{name:<36} {base['median_us']:12.1f} {r['median_us']:12.1f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="benchmarky hernych slucok a vykreslovania")
+    parser.add_argument("-k", "--filter", default="",
+                        help="spusti len benchmarky, ktorych meno obsahuje tento text")
+    parser.add_argument("--repeat", type=int, default=15, help="pocet meranych kol")
+    parser.add_argument("--quick", action="store_true", help="menej kol, na rychlu kontrolu")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", "-o", metavar="SUBOR", help="vysledky zapise do JSON")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="vysledky ulozi ako baseline pre --compare")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="BASELINE",
+                        help="porovna vysledky s ulozenou baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="o kolko moze byt median pomalsi, kym sa to povazuje za regresiu")
+    parser.add_argument("--list", action="store_true", help="len vypise mena benchmarkov")
+    args = parser.parse_args(argv)
+
+    names = [entry[0] for entry in registry if args.filter in entry[0]]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    repeat = 5 if args.quick else args.repeat
+    results = run_all(names, repeat, args.seed)
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeat": repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    for path in filter(None, (args.output, DEFAULT_BASELINE if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("Vysledky zapisane do", path)
+
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Baseline sa nepodarilo nacitat:", e)
+            return 2
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regresii: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
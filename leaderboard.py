@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+# Vysledky vsetkych dohranych hier v SQLite (WAL). Zapisuje ich vlakno na pozadi cez
+# obmedzenu frontu, koniec hry teda len vlozi zaznam do fronty a frame sa nezdrzi.
+# Najlepsie skore pre kazdy mod sa drzi aj v pamati, aby ho HUD nemusel citat z disku.
+# Reset v menu nic nemaze, len si zapamata cas a najlepsie skore sa rata od neho.
+
+SCHEMA_VERSION = 1
+# indexy nesu aj stlpce, ktore vracaju top a top_day, takze dotazy necitaju tabulku
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    finished REAL NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_mode_score
+    ON runs (mode, score DESC, level, duration, finished);
+CREATE INDEX IF NOT EXISTS runs_day_mode_score
+    ON runs (day, mode, score DESC, level, duration, finished);
+"""
+# rekord zo stareho scores.json nevedel, v ktorom mode padol, plati pre oba
+LEGACY_MODE = "legacy"
+
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    # vo WAL staci NORMAL: po pade sa strati najviac posledna transakcia, subor ostane cely
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+def migrate(db, legacy_json):
+    # prvy start: tabulky a prenos rekordu zo scores.json, verzia v user_version
+    if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    with db:
+        db.executescript(SCHEMA)
+        best = 0
+        if legacy_json and os.path.exists(legacy_json):
+            try:
+                with open(legacy_json, "r", encoding="utf-8") as f:
+                    best = int(json.load(f).get("best_score", 0))
+            except (OSError, ValueError, AttributeError):
+                best = 0
+        if best > 0:
+            finished = os.path.getmtime(legacy_json)
+            db.execute("INSERT INTO runs (mode, score, level, duration, finished, day)"
+                       " VALUES (?, ?, 0, 0, ?, ?)",
+                       (LEGACY_MODE, best, finished, day_of(finished)))
+            print(f"Rekord {best} zo {legacy_json} preneseny do databazy")
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def reset_time(db):
+    row = db.execute("SELECT value FROM meta WHERE key = 'reset_at'").fetchone()
+    return row[0] if row else 0.0
+
+
+def top(db, mode, n=10):
+    return db.execute(
+        "SELECT score, level, duration, finished FROM runs WHERE mode = ?"
+        " ORDER BY score DESC LIMIT ?", (mode, n)
+    ).fetchall()
+
+
+def top_day(db, day, mode, n=10):
+    return db.execute(
+        "SELECT score, level, duration, finished FROM runs WHERE day = ? AND mode = ?"
+        " ORDER BY score DESC LIMIT ?", (day, mode, n)
+    ).fetchall()
+
+
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+class Leaderboard:
+    def __init__(self, path="scores.db", legacy_json="scores.json", queue_size=64):
+        self.path = path
+        self.db = connect(path)
+        migrate(self.db, legacy_json)
+        self.best_scores = dict(self.db.execute(
+            "SELECT mode, MAX(score) FROM runs WHERE finished > ? GROUP BY mode",
+            (reset_time(self.db),)
+        ).fetchall())
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.writer = threading.Thread(target=self.write_loop, name="leaderboard", daemon=True)
+        self.writer.start()
+
+    def best(self, mode):
+        return max(self.best_scores.get(mode, 0), self.best_scores.get(LEGACY_MODE, 0))
+
+    def record(self, mode, score, level, duration):
+        # vola sa z Tk vlakna, nikdy neblokuje; plna fronta znamena zahodeny zaznam
+        finished = time.time()
+        if self.put(("run", (mode, score, level, duration, finished, day_of(finished)))):
+            if score > self.best_scores.get(mode, 0):
+                self.best_scores[mode] = score
+
+    def reset(self):
+        # hry ostanu v databaze, najlepsie skore sa odteraz rata len z novsich
+        self.best_scores = {}
+        self.put(("reset", time.time()))
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            print("Fronta vysledkov je plna, zaznam sa neulozi")
+            return False
+        return True
+
+    def write_loop(self):
+        # vlastne spojenie, sqlite3 spojenie patri vlaknu, ktore ho otvorilo;
+        # co sa nazbieralo vo fronte, ide do jednej transakcie
+        db = connect(self.path)
+        while True:
+            items = [self.queue.get()]
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with db:
+                    for kind, row in items:
+                        if kind == "run":
+                            db.execute("INSERT INTO runs (mode, score, level, duration, finished, day)"
+                                       " VALUES (?, ?, ?, ?, ?, ?)", row)
+                        elif kind == "reset":
+                            db.execute("INSERT OR REPLACE INTO meta (key, value)"
+                                       " VALUES ('reset_at', ?)", (row,))
+            except sqlite3.Error as e:
+                print("Vysledky sa nepodarilo zapisat:", e)
+            if any(kind == "stop" for kind, _ in items):
+                db.close()
+                return
+
+    def close(self):
+        # pocka, kym sa zapise vsetko z fronty
+        self.queue.put(("stop", None))
+        self.writer.join()
+        self.db.close()
+
+    def top(self, mode, n=10):
+        return top(self.db, mode, n)
+
+    def top_day(self, day, mode, n=10):
+        return top_day(self.db, day, mode, n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="najlepsie vysledky z databazy hry")
+    parser.add_argument("--db", default="scores.db")
+    parser.add_argument("--mode", choices=("classic", "hardcore"), default="hardcore")
+    parser.add_argument("--day", nargs="?", const=day_of(time.time()), metavar="RRRR-MM-DD",
+                        help="len hry z daneho dna (bez hodnoty dnes)")
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # len cita: databazu nezaklada ani do nej neprenasa scores.json, to robi az hra
+    if not os.path.exists(args.db):
+        print(f"{args.db} neexistuje, este sa nedohrala ziadna hra")
+        return 1
+    db = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        print(f"{args.db} este nema tabulku vysledkov")
+        db.close()
+        return 1
+    rows = top_day(db, args.day, args.mode, args.n) if args.day else top(db, args.mode, args.n)
+    print(f"{'#':>3} {'skore':>7} {'level':>5} {'trvanie':>8}  kedy")
+    for rank, (score, level, duration, finished) in enumerate(rows, 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished))
+        print(f"{rank:>3} {score:>7} {level:>5} {duration:>7.0f}s  {when}")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import struct
+import zlib
+
+
+# Zaznam hry: hlavicka so seedom, nastavenim sveta a subor vln s ich otlackom, potom
+# vstupy po tickoch skomprimovane cez zlib a na konci paticka s vysledkom a otlackom stavu.
+# Jeden tick = smerove klavesy, zamerovac a vystrel, 5 bajtov pred kompresiou.
+
+MAGIC = b"SSRP"
+# verzia 2: casovace sveta idu cez TimerWheel, starsie zaznamy by sa rozisli
+# verzia 3: strely sa testuju spojito po drahe za tick
+# verzia 4: zasahy sa overuju alfa maskami obrazkov
+# verzia 5: hlavicka nesie subor vln a otlacok ich rozpisu
+VERSION = 5
+# za hlavickou ide cesta k suboru vln v UTF-8, jej dlzka je posledne pole (0 = bez vln)
+HEADER = struct.Struct("<4sHIHHHBIH")
+RECORD = struct.Struct("<Bhh")
+FOOTER = struct.Struct("<IIIII")
+
+KEY_LEFT = 1
+KEY_RIGHT = 2
+KEY_UP = 4
+KEY_DOWN = 8
+CROSSHAIR = 16
+FIRE = 32
+
+GAME_MODES = ("classic", "hardcore")
+
+
+def clamp16(value):
+    return max(-32768, min(32767, int(value)))
+
+
+class ReplayWriter:
+    # zapisuje sa prudovo, po kazdych flush_every tickoch sa data dostanu az do suboru,
+    # takze aj pri pade hry zostane pouzitelny zaznam
+    def __init__(self, path, seed, tick_rate, width, height, game_mode, flush_every=40,
+                 waves_path="", waves_digest=0):
+        self.path = path
+        self.file = open(path, "wb")
+        name = waves_path.encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, tick_rate, width, height,
+                                    GAME_MODES.index(game_mode), waves_digest, len(name)))
+        self.file.write(name)
+        self.compressor = zlib.compressobj(9)
+        self.flush_every = flush_every
+        self.ticks = 0
+
+    def write(self, flags, x, y):
+        self.file.write(self.compressor.compress(RECORD.pack(flags, clamp16(x), clamp16(y))))
+        self.ticks += 1
+        if self.ticks % self.flush_every == 0:
+            self.file.write(self.compressor.flush(zlib.Z_SYNC_FLUSH))
+            self.file.flush()
+
+    def close(self, score, level, lives, digest):
+        self.file.write(self.compressor.flush())
+        self.file.write(FOOTER.pack(self.ticks, score, level, lives, digest))
+        self.file.close()
+
+
+class Replay:
+    def __init__(self, seed, tick_rate, width, height, game_mode, records, footer,
+                 waves_path="", waves_digest=0):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.width = width
+        self.height = height
+        self.game_mode = game_mode
+        self.waves_path = waves_path
+        self.waves_digest = waves_digest
+        self.records = records
+        # ticks, score, level, lives, digest; None ak zaznam nebol ukonceny
+        self.footer = footer
+
+
+def read_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version = struct.unpack_from("<4sH", data, 0)
+    if magic != MAGIC:
+        raise ValueError("neplatny subor so zaznamom")
+    if version != VERSION:
+        raise ValueError(f"zaznam je vo verzii {version}, hra prehrava len verziu {VERSION}")
+    (_, _, seed, tick_rate, width, height, mode,
+     waves_digest, name_len) = HEADER.unpack_from(data, 0)
+    start = HEADER.size + name_len
+    waves_path = data[HEADER.size:start].decode("utf-8")
+
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(data[start:])
+    except zlib.error as e:
+        raise ValueError(f"poskodeny zaznam: {e}")
+
+    footer = None
+    if decompressor.eof and len(decompressor.unused_data) == FOOTER.size:
+        footer = FOOTER.unpack(decompressor.unused_data)
+
+    usable = len(raw) - len(raw) % RECORD.size
+    records = list(RECORD.iter_unpack(raw[:usable]))
+    return Replay(seed, tick_rate, width, height, GAME_MODES[mode], records, footer,
+                  waves_path, waves_digest)
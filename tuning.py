@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import HRA
+from replay import CROSSHAIR, FIRE, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_UP
+
+# Ladenie obtiaznosti: tisice hier bez okna v procesoch na vsetkych jadrach, hra ich
+# jednoduchy bot. Kazda kombinacia parametrov z --sweep dostane tie iste seedy, takze
+# rozdiely medzi nimi su z parametrov a nie z nahody.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WIDTH = 1280
+HEIGHT = 720
+
+worker = {}
+
+
+def start_worker(tick_rate, game_mode):
+    # kazdy proces si raz postavi svet a potom ho pre kazdu hru len resetuje
+    os.chdir(ROOT)
+    worker["world"] = HRA.World(WIDTH, HEIGHT, player_img=HRA.load_player_image(),
+                                tick_rate=tick_rate, masks=HRA.load_enemy_masks())
+    worker["game_mode"] = game_mode
+
+
+def bot_input(world):
+    # uhyba pred najblizsou strelou alebo nepriatelom, inak sa vracia dole na stred,
+    # a strieli po najblizsom zivom nepriatelovi
+    player = world.player
+    px, py = player.x, player.y
+    flags = CROSSHAIR | FIRE
+    aim_x, aim_y = px, world.line_y + 1
+
+    threat = None
+    best = 130.0 ** 2
+    n = world.projectiles.count
+    if n:
+        dx = world.projectiles.x[:n] - px
+        dy = world.projectiles.y[:n] - py
+        dist = dx * dx + dy * dy
+        i = int(dist.argmin())
+        if dist[i] < best:
+            best = dist[i]
+            threat = (float(dx[i]), float(dy[i]))
+
+    enemies = world.enemies
+    alive = (~enemies.dying[:enemies.count]).nonzero()[0]
+    if len(alive):
+        dx = enemies.x[alive] - px
+        dy = enemies.y[alive] - py
+        dist = dx * dx + dy * dy
+        i = int(dist.argmin())
+        aim_x = float(enemies.x[alive[i]])
+        aim_y = max(float(enemies.y[alive[i]]), world.line_y + 1)
+        if dist[i] < best:
+            threat = (float(dx[i]), float(dy[i]))
+
+    if threat is not None:
+        dx, dy = threat
+        flags |= KEY_LEFT if dx > 0 else KEY_RIGHT
+        flags |= KEY_UP if dy > 0 else KEY_DOWN
+    else:
+        home_x = world.width / 2
+        home_y = world.height - 80
+        if abs(px - home_x) > 40:
+            flags |= KEY_LEFT if px > home_x else KEY_RIGHT
+        if abs(py - home_y) > 40:
+            flags |= KEY_UP if py > home_y else KEY_DOWN
+    return flags, aim_x, aim_y
+
+
+def play(task):
+    # jedna hra: vrati pocet tickov, skore, level a tick, v ktorom sa zacal kazdy level
+    config, difficulty, seed, max_ticks = task
+    world = worker["world"]
+    world.difficulty = difficulty
+    world.reset_game(worker["game_mode"], seed=seed)
+    level_start = [0]
+    ticks = 0
+    while not world.game_over and ticks < max_ticks:
+        world.apply_input(*bot_input(world))
+        world.tick_game()
+        ticks += 1
+        while world.level > len(level_start):
+            level_start.append(ticks)
+    return config, seed, ticks, world.score, world.level, world.game_over, level_start
+
+
+def parse_value(text, default):
+    if isinstance(default, tuple):
+        return tuple(float(v) for v in text.split("/"))
+    return type(default)(text)
+
+
+def parse_sweep(items):
+    # --sweep kluc=a,b,c; n-tice sa pisu s lomitkom, napr. weights_high=0.2/0.4/0.4
+    keys = []
+    values = []
+    for item in items:
+        key, _, text = item.partition("=")
+        if key not in HRA.DIFFICULTY:
+            raise SystemExit(f"neznamy parameter {key}, mozne: {', '.join(HRA.DIFFICULTY)}")
+        keys.append(key)
+        values.append([parse_value(v, HRA.DIFFICULTY[key]) for v in text.split(",")])
+    return keys, [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def run_games(configs, games, seed, max_ticks, workers, tick_rate, game_mode):
+    tasks = [(c, dict(HRA.DIFFICULTY, **overrides), seed + g, max_ticks)
+             for c, overrides in enumerate(configs) for g in range(games)]
+    # vacsie davky setria prenos medzi procesmi, ale nech ich je dost na vyrovnanie zataze
+    chunk = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(workers, initializer=start_worker,
+                             initargs=(tick_rate, game_mode)) as pool:
+        return list(pool.map(play, tasks, chunksize=chunk))
+
+
+def columns(results, tick_rate):
+    # vysledky po stlpcoch: jeden riadok na hru, level_ticks ma stlpec na kazdy level
+    levels = max(len(r[6]) for r in results)
+    level_ticks = np.zeros((len(results), levels), np.int32)
+    for row, r in enumerate(results):
+        starts = r[6] + [r[2]]
+        level_ticks[row, :len(r[6])] = np.diff(starts)
+    return {
+        "config": np.array([r[0] for r in results], np.int16),
+        "seed": np.array([r[1] for r in results], np.uint32),
+        "ticks": np.array([r[2] for r in results], np.int32),
+        "score": np.array([r[3] for r in results], np.int32),
+        "level": np.array([r[4] for r in results], np.int16),
+        "died": np.array([r[5] for r in results], bool),
+        "level_ticks": level_ticks,
+        "tick_rate": np.array(tick_rate),
+    }
+
+
+def report(data, keys, configs):
+    tick_rate = int(data["tick_rate"])
+    for c, overrides in enumerate(configs):
+        rows = data["config"] == c
+        seconds = data["ticks"][rows] / tick_rate
+        score = data["score"][rows]
+        level = data["level"][rows]
+        died = data["died"][rows]
+        level_s = data["level_ticks"][rows] / tick_rate
+        label = "  ".join(f"{k}={overrides[k]}" for k in keys) or "predvolene"
+        s10, s50, s90 = np.percentile(seconds, (10, 50, 90))
+        c10, c50, c90 = np.percentile(score, (10, 50, 90))
+        print(f"\n[{c}] {label}")
+        print(f"  hier {rows.sum()}  prezitie p10/p50/p90 {s10:.1f}/{s50:.1f}/{s90:.1f} s"
+              f"  skore {c10:.0f}/{c50:.0f}/{c90:.0f}  nedohranych {int((~died).sum())}")
+        print(f"  {'level':>5} {'dosiahlo':>8} {'zomrelo':>8} {'p10 s':>7} {'p50 s':>7} {'p90 s':>7}")
+        for lv in range(1, int(level.max()) + 1):
+            reached = level >= lv
+            deaths = int((died & (level == lv)).sum())
+            t10, t50, t90 = np.percentile(level_s[reached, lv - 1], (10, 50, 90))
+            print(f"  {lv:>5} {int(reached.sum()):>8} {deaths:>8} {t10:7.1f} {t50:7.1f} {t90:7.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ladenie obtiaznosti hrami bota bez okna")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KLUC=A,B",
+                        help="hodnoty parametra z HRA.DIFFICULTY, skusia sa vsetky kombinacie")
+    parser.add_argument("--games", type=int, default=200, help="pocet hier na kombinaciu")
+    parser.add_argument("--seed", type=int, default=1, help="seed prvej hry")
+    parser.add_argument("--minutes", type=float, default=5,
+                        help="najdlhsia hra v minutach hry, potom sa ukonci")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tick-rate", type=int, choices=(20, 40, 60, 120), default=HRA.BASE_TICK_RATE)
+    parser.add_argument("--mode", choices=("classic", "hardcore"), default="classic")
+    parser.add_argument("--output", "-o", metavar="SUBOR", default="tuning.npz",
+                        help="vysledky po stlpcoch ako NumPy .npz")
+    parser.add_argument("--scaling", action="store_true",
+                        help="zmeria tu istu davku s 1, 2, 4 ... procesmi a skonci")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    keys, configs = parse_sweep(args.sweep)
+    max_ticks = int(args.minutes * 60 * args.tick_rate)
+
+    def run(workers):
+        return run_games(configs, args.games, args.seed, max_ticks, workers,
+                         args.tick_rate, args.mode)
+
+    if args.scaling:
+        counts = sorted({min(2 ** i, args.workers) for i in range(int(math.log2(args.workers)) + 1)}
+                        | {args.workers})
+        print(f"{'procesy':>7} {'cas s':>8} {'hier/s':>8} {'zrychlenie':>10} {'ucinnost':>8}")
+        base = None
+        for workers in counts:
+            start = time.perf_counter()
+            run(workers)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            speedup = base / elapsed
+            print(f"{workers:>7} {elapsed:8.2f} {len(configs) * args.games / elapsed:8.1f}"
+                  f" {speedup:10.2f} {speedup / workers:8.2f}")
+        return 0
+
+    start = time.perf_counter()
+    results = run(args.workers)
+    elapsed = time.perf_counter() - start
+    ticks = sum(r[2] for r in results)
+    print(f"{len(results)} hier, {ticks} tickov za {elapsed:.1f} s na {args.workers} procesoch"
+          f" ({ticks / elapsed:.0f} tickov/s)")
+
+    data = columns(results, args.tick_rate)
+    for key in keys:
+        data["param_" + key] = np.array([overrides[key] for overrides in configs])
+    np.savez_compressed(args.output, **data)
+    print("Vysledky zapisane do", args.output)
+    report(data, keys, configs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
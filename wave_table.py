@@ -0,0 +1,119 @@
+import json
+import random
+import zlib
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+# Vlny nepriatelov z JSON alebo TOML suboru sa pri nacitani prelozia na hotovy rozpis:
+# cas v sekundach, druh, poloha, rychlost a ci striela. Vsetka nahoda (rozptyl polohy,
+# rychlosti, strelci) sa hodi uz tu zo seedu v subore, takze kazda hra ma rovnake vlny.
+#
+# {"seed": 1, "then": "endless", "waves": [
+#     {"at": 0, "kind": "basic", "count": 8, "every": 0.5, "edge": "top",
+#      "pos": [0.1, 0.9], "spacing": "even", "speed": [2, 4], "shoot": 0.5}]}
+#
+# edge: top (zhora dole), left / right (zboku dovnutra) alebo field (rovno v hracej ploche,
+# hlbka "depth" je podiel jej vysky, predvolene [0.1, 0.6], aby spodok ostal hracovi);
+# pos je podiel sirky alebo vysky, cislo alebo [od, do].
+# kind moze byt aj slovnik vah, napr. {"basic": 2, "chaser": 1}.
+# then: co po poslednej vlne - endless (nahodni nepriatelia podla levelu), loop alebo stop.
+
+THEN = ("endless", "loop", "stop")
+EDGES = ("top", "left", "right", "field")
+
+
+class WaveSchedule:
+    def __init__(self, name, entries, then, path=None):
+        self.name = name
+        # (cas, druh, x, y, vx, vy, can_shoot) zoradene podla casu
+        self.entries = entries
+        self.then = then
+        self.path = path
+        # otlacok hotoveho rozpisu, zaznam hry podla neho spozna, ci ma tie iste vlny
+        self.digest = zlib.crc32(repr((then, entries)).encode("utf-8"))
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def pick(rng, value):
+    # cislo alebo rozsah [od, do]; cele cisla sa losuju ako cele, ako randint v hre
+    if isinstance(value, (int, float)):
+        return value
+    low, high = value
+    if isinstance(low, int) and isinstance(high, int):
+        return rng.randint(low, high)
+    return rng.uniform(low, high)
+
+
+def along(rng, pos, spacing, k, count):
+    if isinstance(pos, (int, float)):
+        return pos
+    low, high = pos
+    if spacing == "even":
+        return low + (high - low) * (k + 0.5) / count
+    return rng.uniform(low, high)
+
+
+def compile_waves(data, width, height, kinds, name="vlny", path=None):
+    rng = random.Random(data.get("seed", 0))
+    then = data.get("then", "endless")
+    if then not in THEN:
+        raise ValueError(f"{name}: then musi byt jedno z {', '.join(THEN)}, nie {then}")
+    line_y = height // 4
+    entries = []
+
+    for n, wave in enumerate(data.get("waves", [])):
+        kind = wave.get("kind", "basic")
+        weights = kind if isinstance(kind, dict) else {kind: 1}
+        for k in weights:
+            if k not in kinds:
+                raise ValueError(f"{name}: vlna {n} ma neznamy druh {k}")
+        edge = wave.get("edge", "top")
+        if edge not in EDGES:
+            raise ValueError(f"{name}: vlna {n} ma neznamy okraj {edge}")
+
+        count = int(wave.get("count", 1))
+        every = float(wave.get("every", 0))
+        start = float(wave.get("at", 0))
+        pos = wave.get("pos", [0.05, 0.95])
+        spacing = wave.get("spacing", "random")
+        speed = wave.get("speed", [2, 4])
+        shoot = wave.get("shoot", 0.5)
+
+        for k in range(count):
+            kind = rng.choices(list(weights), weights=list(weights.values()))[0]
+            v = pick(rng, speed)
+            p = along(rng, pos, spacing, k, count)
+            vx = vy = 0
+            if edge == "top":
+                x, y, vy = width * p, -20, v
+            elif edge == "left":
+                x, y, vx = -40, line_y + 50 + (height - line_y - 100) * p, v
+            elif edge == "right":
+                x, y, vx = width + 40, line_y + 50 + (height - line_y - 100) * p, -v
+            else:
+                depth = along(rng, wave.get("depth", [0.1, 0.6]), spacing, k, count)
+                x, y, vy = width * p, line_y + (height - line_y) * depth, v
+            can_shoot = rng.random() < shoot if isinstance(shoot, float) else bool(shoot)
+            entries.append((start + every * k, kind, x, y, vx, vy, can_shoot))
+
+    entries.sort(key=lambda e: e[0])
+    return WaveSchedule(data.get("name", name), entries, then, path)
+
+
+def load_waves(path, width, height, kinds):
+    # .toml ide cez tomllib (Python 3.11+), vsetko ostatne sa cita ako JSON
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML vlny potrebuju Python 3.11 alebo novsi, pouzi JSON")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    return compile_waves(data, width, height, kinds, name=path, path=path)